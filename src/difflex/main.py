@@ -28,7 +28,7 @@ def main():
         init_translator()
 
     # Create and show main window
-    window = MainWindow()
+    window = MainWindow(settings)
     window.show()
 
     sys.exit(app.exec())
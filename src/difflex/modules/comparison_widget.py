@@ -1,33 +1,143 @@
 """Comparison tab widget."""
 
-import subprocess
 from pathlib import Path
 from typing import List
-from PySide6.QtWidgets import (
-    QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
-    QTableWidget, QTableWidgetItem, QProgressBar, QHeaderView,
-    QAbstractItemView, QSplitter
-)
-from PySide6.QtCore import Qt, Signal
+from PySide6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QTableView, QProgressBar, QHeaderView, QAbstractItemView, QSplitter
+from PySide6.QtCore import Qt, Signal, QTimer, QAbstractTableModel, QModelIndex
 from PySide6.QtGui import QColor
 
-from ..utils.file_types import FileTypeDetector, FileType
+from ..utils.file_types import FileType
 from ..utils.comparator import ComparisonResult
 from ..utils.settings import Settings
 from ..utils.i18n import tr
-from .comparison_worker import DirectoryComparisonWorker, FileComparisonItem
+from ..utils.external_tool import build_tool_args, launch
+from .comparison_worker import DirectoryComparisonWorker, FileComparisonItem, PROGRESS_MESSAGE_KEYS
+
+# Cell background colors
+COLOR_IDENTICAL = QColor(200, 255, 200)
+COLOR_SIMILAR = QColor(255, 255, 200)
+COLOR_DIFFERENT = QColor(255, 200, 200)
+COLOR_MISSING = QColor(220, 220, 220)
+
+
+class ComparisonModel(QAbstractTableModel):
+    """Table model backed directly by FileComparisonItem objects."""
+
+    def __init__(self, num_paths: int, parent=None):
+        """
+        Initialize comparison model.
+
+        Args:
+            num_paths: Number of compared locations
+            parent: Parent object
+        """
+        super().__init__(parent)
+        self.num_paths = num_paths
+        self.items: List[FileComparisonItem] = []
+        self._row_by_name: dict[str, int] = {}
+
+        # Columns: name, then location / result pairs
+        self._headers = [tr("file_name")]
+        for i in range(num_paths):
+            self._headers.append(tr("comparison_location", i + 1))
+            if i < num_paths - 1:
+                self._headers.append(tr("comparison_result"))
+
+    def rowCount(self, parent=QModelIndex()):
+        """Return number of rows."""
+        return 0 if parent.isValid() else len(self.items)
+
+    def columnCount(self, parent=QModelIndex()):
+        """Return number of columns."""
+        return 0 if parent.isValid() else len(self._headers)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        """Return header labels."""
+        if orientation == Qt.Orientation.Horizontal and role == Qt.ItemDataRole.DisplayRole:
+            return self._headers[section]
+        return None
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        """Return cell data for the given role."""
+        if not index.isValid():
+            return None
+
+        item = self.items[index.row()]
+        column = index.column()
+
+        # File name
+        if column == 0:
+            return item.name if role == Qt.ItemDataRole.DisplayRole else None
+
+        # Paths
+        if column % 2 == 1:
+            path = item.paths[(column - 1) // 2]
+            if role == Qt.ItemDataRole.DisplayRole:
+                return path or ""
+            if role == Qt.ItemDataRole.BackgroundRole and not path:
+                return COLOR_MISSING
+            return None
+
+        # Results (empty until the item has been compared)
+        result_idx = (column - 2) // 2
+        if result_idx >= len(item.results):
+            return None
+        if role == Qt.ItemDataRole.TextAlignmentRole:
+            return Qt.AlignmentFlag.AlignCenter
+
+        result = item.results[result_idx]
+        if role == Qt.ItemDataRole.DisplayRole:
+            return "-" if result is None else str(result)
+        if role == Qt.ItemDataRole.BackgroundRole:
+            if result is None:
+                return COLOR_MISSING
+            if result.status == ComparisonResult.IDENTICAL:
+                return COLOR_IDENTICAL
+            if result.status in (ComparisonResult.SIMILAR, ComparisonResult.SIMILAR_EXIF):
+                return COLOR_SIMILAR
+            return COLOR_DIFFERENT
+        return None
+
+    def add_items(self, items: List[FileComparisonItem]):
+        """
+        Append items as new rows in one insertion.
+
+        Args:
+            items: Items to append
+        """
+        if not items:
+            return
+
+        first_row = len(self.items)
+        self.beginInsertRows(QModelIndex(), first_row, first_row + len(items) - 1)
+        for offset, item in enumerate(items):
+            self._row_by_name[item.name] = first_row + offset
+        self.items.extend(items)
+        self.endInsertRows()
+
+    def refresh_results(self, items: List[FileComparisonItem]):
+        """
+        Notify views that results of the given items changed.
+
+        Args:
+            items: Items whose results were updated
+        """
+        rows = [row for row in (self._row_by_name.get(item.name) for item in items) if row is not None]
+        if not rows:
+            return
+
+        last_column = len(self._headers) - 1
+        self.dataChanged.emit(self.index(min(rows), 0), self.index(max(rows), last_column))
+
+    def item_at(self, row: int) -> FileComparisonItem:
+        """Return the item shown in the given row."""
+        return self.items[row]
 
 
 class ComparisonWidget(QWidget):
     """Widget for displaying file/directory comparison."""
 
-    def __init__(
-        self,
-        paths: List[str],
-        is_directory: bool,
-        settings: Settings,
-        parent=None
-    ):
+    def __init__(self, paths: List[str], is_directory: bool, settings: Settings, parent=None):
         """
         Initialize comparison widget.
 
@@ -42,13 +152,19 @@ class ComparisonWidget(QWidget):
         self.is_directory = is_directory
         self.settings = settings
         self.worker = None
+        self._thresholds = (settings.get_text_similarity_threshold(), settings.get_image_similarity_threshold(), settings.get_binary_similarity_threshold())
+        self._pending_rows: List[FileComparisonItem] = []
+        self._pending_results: List[FileComparisonItem] = []
+
+        # Coalesce worker signals into batched model updates
+        self._flush_timer = QTimer(self)
+        self._flush_timer.setSingleShot(True)
+        self._flush_timer.setInterval(50)
+        self._flush_timer.timeout.connect(self._flush_rows)
 
         # Setup file type detector
-        text_exts = set(self.settings.get_text_extensions().split('\n'))
-        text_exts = {ext.strip() for ext in text_exts if ext.strip()}
-        image_exts = set(self.settings.get_image_extensions().split('\n'))
-        image_exts = {ext.strip() for ext in image_exts if ext.strip()}
-        self.detector = FileTypeDetector(text_exts, image_exts)
+        self.detector = self.settings.get_file_type_detector()
+        self._file_type = None if is_directory else self.detector.detect(self.paths[0])
 
         self._setup_ui()
 
@@ -64,10 +180,7 @@ class ComparisonWidget(QWidget):
 
         # Header
         comp_type = tr("directory_comparison") if self.is_directory else tr("file_comparison")
-        header = QLabel(
-            comp_type + ": " +
-            " vs ".join([p.name for p in self.paths])
-        )
+        header = QLabel(comp_type + ": " + " vs ".join([p.name for p in self.paths]))
         header.setStyleSheet("font-weight: bold; font-size: 12px;")
         layout.addWidget(header)
 
@@ -78,25 +191,13 @@ class ComparisonWidget(QWidget):
         layout.addWidget(self.progress_bar)
 
         # Table
-        self.table = QTableWidget()
+        self.model = ComparisonModel(len(self.paths), self)
+        self.table = QTableView()
+        self.table.setModel(self.model)
         self.table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
         self.table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
         self.table.doubleClicked.connect(self._on_row_double_clicked)
 
-        # Setup columns
-        num_paths = len(self.paths)
-        num_result_cols = num_paths - 1
-        total_cols = 1 + num_paths + num_result_cols  # name + paths + results
-
-        self.table.setColumnCount(total_cols)
-        headers = [tr("file_name")]
-
-        for i, path in enumerate(self.paths):
-            headers.append(tr("comparison_location", i+1))
-            if i < num_paths - 1:
-                headers.append(tr("comparison_result"))
-
-        self.table.setHorizontalHeaderLabels(headers)
         self.table.horizontalHeader().setStretchLastSection(False)
         self.table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
 
@@ -125,29 +226,19 @@ class ComparisonWidget(QWidget):
         self.progress_label.setText(tr("file_comparison_complete"))
         self.stop_btn.setEnabled(False)
 
-        # Add single row
-        self.table.setRowCount(1)
-
-        # File name
-        self.table.setItem(0, 0, QTableWidgetItem(tr("file_comparison")))
-
-        # Paths
-        for i, path in enumerate(self.paths):
-            self.table.setItem(0, 1 + i * 2, QTableWidgetItem(str(path)))
-
         # Compare files
-        file_type = self.detector.detect(self.paths[0])
+        file_type = self._file_type
 
         from ..utils.comparator import TextComparator, ImageComparator, BinaryComparator
 
-        text_threshold = self.settings.get_text_similarity_threshold()
-        image_threshold = self.settings.get_image_similarity_threshold()
-        binary_threshold = self.settings.get_binary_similarity_threshold()
+        text_threshold, image_threshold, binary_threshold = self._thresholds
 
+        results = []
         for i in range(len(self.paths) - 1):
             path1 = self.paths[i]
             path2 = self.paths[i + 1]
 
+            # The comparators report paths to the same file as identical without reading them
             if file_type == FileType.TEXT:
                 result = TextComparator.compare(path1, path2, text_threshold)
             elif file_type == FileType.IMAGE:
@@ -155,92 +246,64 @@ class ComparisonWidget(QWidget):
             else:
                 result = BinaryComparator.compare(path1, path2, binary_threshold)
 
-            item = QTableWidgetItem(str(result))
-            item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-
-            # Color code
-            if result.status == ComparisonResult.IDENTICAL:
-                item.setBackground(QColor(200, 255, 200))
-            elif result.status in (ComparisonResult.SIMILAR, ComparisonResult.SIMILAR_EXIF):
-                item.setBackground(QColor(255, 255, 200))
-            else:
-                item.setBackground(QColor(255, 200, 200))
+            results.append(result)
 
-            self.table.setItem(0, 2 + i * 2, item)
+        # Single row
+        item = FileComparisonItem(tr("file_comparison"), [str(p) for p in self.paths], file_type)
+        item.results = results
+        self.model.add_items([item])
 
         self.open_btn.setEnabled(True)
 
     def _start_directory_comparison(self):
         """Start directory comparison."""
-        text_threshold = self.settings.get_text_similarity_threshold()
-        image_threshold = self.settings.get_image_similarity_threshold()
-        binary_threshold = self.settings.get_binary_similarity_threshold()
+        text_threshold, image_threshold, binary_threshold = self._thresholds
 
         self.worker = DirectoryComparisonWorker(
-            self.paths,
-            self.detector,
-            text_threshold,
-            image_threshold,
-            binary_threshold
+            self.paths, self.detector, text_threshold, image_threshold, binary_threshold, self.settings.get_comparison_workers() or None
         )
 
         self.worker.progress.connect(self._on_progress)
-        self.worker.file_found.connect(self._on_file_found)
+        self.worker.files_found.connect(self._on_files_found)
         self.worker.comparison_complete.connect(self._on_comparison_complete)
         self.worker.finished.connect(self._on_finished)
 
         self.worker.start()
 
-    def _on_progress(self, current: int, total: int, message: str):
+    def _on_progress(self, current: int, total: int, code: int, arg: str):
         """Handle progress update."""
         self.progress_bar.setMaximum(total)
         self.progress_bar.setValue(current)
-        self.progress_label.setText(message)
+        self.progress_label.setText(tr(PROGRESS_MESSAGE_KEYS[code], arg))
 
-    def _on_file_found(self, item: FileComparisonItem):
-        """Handle file found."""
-        row = self.table.rowCount()
-        self.table.insertRow(row)
-
-        # File name
-        self.table.setItem(row, 0, QTableWidgetItem(item.name))
-
-        # Paths
-        num_paths = len(item.paths)
-        for i, path in enumerate(item.paths):
-            path_str = str(path) if path else ""
-            path_item = QTableWidgetItem(path_str)
-            if not path:
-                path_item.setBackground(QColor(220, 220, 220))
-            self.table.setItem(row, 1 + i * 2, path_item)
+    def _on_files_found(self, items: List[FileComparisonItem]):
+        """Handle a batch of found files."""
+        self._pending_rows.extend(items)
+        self._schedule_flush()
 
     def _on_comparison_complete(self, item: FileComparisonItem, results: List):
         """Handle comparison complete."""
-        # Find the row for this item
-        for row in range(self.table.rowCount()):
-            if self.table.item(row, 0).text() == item.name:
-                # Add results
-                for i, result in enumerate(results):
-                    if result is None:
-                        result_item = QTableWidgetItem("-")
-                        result_item.setBackground(QColor(220, 220, 220))
-                    else:
-                        result_item = QTableWidgetItem(str(result))
-
-                        # Color code
-                        if result.status == ComparisonResult.IDENTICAL:
-                            result_item.setBackground(QColor(200, 255, 200))
-                        elif result.status in (ComparisonResult.SIMILAR, ComparisonResult.SIMILAR_EXIF):
-                            result_item.setBackground(QColor(255, 255, 200))
-                        else:
-                            result_item.setBackground(QColor(255, 200, 200))
-
-                    result_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-                    self.table.setItem(row, 2 + i * 2, result_item)
-                break
+        item.results = results
+        self._pending_results.append(item)
+        self._schedule_flush()
+
+    def _schedule_flush(self):
+        """Start the flush timer if it is not already pending."""
+        if not self._flush_timer.isActive():
+            self._flush_timer.start()
+
+    def _flush_rows(self):
+        """Apply buffered rows and results to the model in a single batch."""
+        rows, self._pending_rows = self._pending_rows, []
+        results, self._pending_results = self._pending_results, []
+
+        self.model.add_items(rows)
+        self.model.refresh_results(results)
 
     def _on_finished(self):
         """Handle worker finished."""
+        self._flush_timer.stop()
+        self._flush_rows()
         self.stop_btn.setEnabled(False)
         self.open_btn.setEnabled(True)
 
@@ -255,41 +318,17 @@ class ComparisonWidget(QWidget):
 
     def _open_in_external_tool(self):
         """Open selected files in external tool."""
-        current_row = self.table.currentRow()
-        if current_row < 0:
+        index = self.table.currentIndex()
+        if not index.isValid():
             return
 
-        # Get file paths from the row
-        file_paths = []
-        num_paths = len(self.paths)
-
-        if self.is_directory:
-            # Get paths from table cells
-            for i in range(num_paths):
-                path_text = self.table.item(current_row, 1 + i * 2).text()
-                if path_text:
-                    file_paths.append(path_text)
-                else:
-                    file_paths.append(None)
-        else:
-            # Use original paths
-            file_paths = [str(p) for p in self.paths]
-
-        # Determine file type
-        file_type = None
-        for path in file_paths:
-            if path:
-                detected = self.detector.detect(Path(path))
-                if detected == FileType.TEXT:
-                    file_type = "text"
-                elif detected == FileType.IMAGE:
-                    file_type = "image"
-                else:
-                    file_type = "binary"
-                break
-
-        if not file_type:
+        # Get file paths and detected type from the row's item
+        item = self.model.item_at(index.row())
+        file_paths = item.paths
+
+        if not any(file_paths):
             return
+        file_type = item.file_type.value
 
         # Get external tool config
         config = self.settings.get_external_tool_config(file_type)
@@ -298,40 +337,9 @@ class ComparisonWidget(QWidget):
         if not executable:
             return
 
-        # Build command
-        args = []
-
-        arg_before = config.get("arg_before", "").strip()
-        if arg_before:
-            args.append(arg_before)
-
-        arg_templates = [
-            config.get("arg1", "%s"),
-            config.get("arg2", "%s"),
-            config.get("arg3", "%s")
-        ]
-
-        pack_args = config.get("pack_args", False)
-
-        if pack_args:
-            # Pack arguments (remove gaps)
-            for path in file_paths:
-                if path and arg_templates:
-                    template = arg_templates.pop(0)
-                    args.append(template.replace("%s", path))
-        else:
-            # Use arguments as-is
-            for i, (path, template) in enumerate(zip(file_paths, arg_templates)):
-                if i < len(file_paths) and file_paths[i]:
-                    args.append(template.replace("%s", file_paths[i]))
-
-        arg_after = config.get("arg_after", "").strip()
-        if arg_after:
-            args.append(arg_after)
-
         # Execute
         try:
-            subprocess.Popen([executable] + args)
+            launch(executable, build_tool_args(config, file_paths))
         except Exception as e:
             print(f"Failed to open external tool: {e}")
 
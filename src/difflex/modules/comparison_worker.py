@@ -1,29 +1,208 @@
 """Directory comparison worker thread."""
 
 import os
+import sys
+import time
+from collections import defaultdict
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
+from itertools import islice
 from pathlib import Path
-from typing import List, Tuple
+from typing import Dict, List, Optional, Tuple
 from PySide6.QtCore import QThread, Signal
 
 from ..utils.file_types import FileTypeDetector, FileType
-from ..utils.comparator import TextComparator, ImageComparator, BinaryComparator, ComparisonResult
+from ..utils.comparator import TextComparator, ImageComparator, BinaryComparator, ComparisonResult, cached_compare
+
+# Number of items delivered per files_found signal
+FOUND_BATCH_SIZE = 64
+# Minimum seconds between progress signals while comparing
+PROGRESS_INTERVAL = 0.1
+# Items kept queued or running per comparison thread
+IN_FLIGHT_PER_WORKER = 2
+
+# Progress message codes, formatted on the receiving side
+PROGRESS_COLLECTING = 0
+PROGRESS_COMPARING = 1
+PROGRESS_DONE = 2
+
+# Translation key for each progress message code
+PROGRESS_MESSAGE_KEYS = {
+    PROGRESS_COLLECTING: "collecting_files",
+    PROGRESS_COMPARING: "comparing_file",
+    PROGRESS_DONE: "comparison_complete",
+}
+
+# Scanned directory entry: (absolute path string, stat result or None, is directory)
+ScanEntry = Tuple[str, Optional[os.stat_result], bool]
+
+
+def _compare_files(
+    file1: str,
+    file2: str,
+    file_type: FileType,
+    text_threshold: float,
+    image_threshold: float,
+    binary_threshold: float,
+    stats: Tuple[os.stat_result, os.stat_result] | None = None,
+) -> ComparisonResult:
+    """Compare two files; the comparators settle same-file pairs and size bounds from the stat results."""
+    if file_type == FileType.TEXT:
+        # TextComparator settles byte-equal files from their cached digests before decoding anything
+        return cached_compare(TextComparator, file1, file2, text_threshold, stats)
+    elif file_type == FileType.IMAGE:
+        return cached_compare(ImageComparator, file1, file2, image_threshold, stats)
+    else:
+        return cached_compare(BinaryComparator, file1, file2, binary_threshold, stats)
+
+
+def _stat_or_none(path: str) -> os.stat_result | None:
+    """Stat a file, or return None if it cannot be statted (the comparator then reports the error)."""
+    try:
+        return os.stat(path)
+    except OSError:
+        return None
+
+
+def _compare_item(
+    paths: List[str | None],
+    sizes: List[int | None],
+    file_type: FileType,
+    text_threshold: float,
+    image_threshold: float,
+    binary_threshold: float,
+    mtimes: List[int | None] | None = None,
+) -> List[ComparisonResult | None]:
+    """
+    Compare the files of a single item.
+
+    Runs on a pool thread, so it must not touch the worker or any Qt object.
+
+    Returns:
+        List of comparison results. For 2 files: [result], for 3 files: [result1_2, result2_3]
+    """
+    results = []
+    # Each file is statted at most once, even when it is part of two pairs
+    stats: List[os.stat_result | None] = [None] * len(paths)
+
+    # Compare consecutive pairs
+    for i in range(len(paths) - 1):
+        path1 = paths[i]
+        path2 = paths[i + 1]
+
+        if path1 is None or path2 is None:
+            results.append(None)
+            continue
+
+        # Modification times are only passed when matching size and time may be trusted without reading the files.
+        # The scanned values need no syscall at all.
+        if mtimes is not None and sizes[i] is not None and sizes[i] == sizes[i + 1] and mtimes[i] is not None and mtimes[i] == mtimes[i + 1]:
+            results.append(ComparisonResult(ComparisonResult.IDENTICAL, 100.0, "Same size and modification time"))
+            continue
+
+        for j in (i, i + 1):
+            if stats[j] is None:
+                stats[j] = _stat_or_none(paths[j])
+        pair_stats = None
+        if stats[i] is not None and stats[i + 1] is not None:
+            pair_stats = (stats[i], stats[i + 1])
+
+        results.append(_compare_files(path1, path2, file_type, text_threshold, image_threshold, binary_threshold, pair_stats))
+
+    return results
+
+
+def _walk_directory(directory: Path) -> Dict[str, Tuple[str, int | None]]:
+    """
+    Recursively list the files under a directory.
+
+    Args:
+        directory: Root directory
+
+    Returns:
+        Dict mapping relative path to (absolute path string, size in bytes or None)
+    """
+    files = {}
+    root_str = os.fspath(directory)
+    prefix_len = len(os.path.join(root_str, ""))
+    stack = [root_str]
+
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.is_file():
+                        try:
+                            size = entry.stat().st_size
+                        except OSError:
+                            size = None
+                        files[entry.path[prefix_len:]] = (entry.path, size)
+        except OSError:
+            continue
+
+    return files
+
+
+def _scan_directory(directory: Path) -> Dict[str, ScanEntry]:
+    """
+    Recursively list the files and directories under a directory.
+
+    Args:
+        directory: Root directory
+
+    Returns:
+        Dict mapping relative path to its scan entry
+    """
+    entries = {}
+    root_str = os.fspath(directory)
+    # Relative paths are sliced off the entry path; os.path.relpath would normalize every one of them
+    prefix_len = len(os.path.join(root_str, ""))
+    stack = [root_str]
+
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as scan:
+                for entry in scan:
+                    # Links to directories are listed as directories but not descended into
+                    is_dir = entry.is_dir()
+                    stat = None
+                    if is_dir:
+                        if not entry.is_symlink():
+                            stack.append(entry.path)
+                    else:
+                        # DirEntry caches the stat, so the tree never has to stat the file again
+                        try:
+                            stat = entry.stat()
+                        except OSError:
+                            pass
+                    entries[entry.path[prefix_len:]] = (entry.path, stat, is_dir)
+        except OSError:
+            continue
+
+    return entries
 
 
 class FileComparisonItem:
     """Item representing a file comparison."""
 
-    def __init__(self, name: str, paths: List[Path | None], file_type: FileType):
+    def __init__(self, name: str, paths: List[str | None], file_type: FileType, sizes: List[int | None] | None = None, mtimes: List[int | None] | None = None):
         """
         Initialize file comparison item.
 
         Args:
             name: Relative path/name of the file
-            paths: List of file paths (None if file doesn't exist in that location)
+            paths: List of file path strings (None if file doesn't exist in that location)
             file_type: Type of the file
+            sizes: File sizes in bytes per location (None if unknown or missing)
+            mtimes: Modification times in nanoseconds per location; when given, files with equal
+                size and time are reported identical without being read
         """
         self.name = name
         self.paths = paths
         self.file_type = file_type
+        self.sizes = sizes if sizes is not None else [None] * len(paths)
+        self.mtimes = mtimes
         self.results: List[ComparisonResult | None] = []
 
     def __repr__(self):
@@ -31,21 +210,97 @@ class FileComparisonItem:
         return f"FileComparisonItem({self.name}, {len(self.paths)} paths)"
 
 
-class DirectoryComparisonWorker(QThread):
-    """Worker thread for directory comparison."""
+class ItemComparisonWorker(QThread):
+    """Worker thread comparing prepared file comparison items."""
 
-    progress = Signal(int, int, str)  # current, total, message
-    file_found = Signal(object)  # FileComparisonItem
+    progress = Signal(int, int, int, str)  # current, total, message code, message argument
     comparison_complete = Signal(object, list)  # FileComparisonItem, results
     finished = Signal()
 
+    def __init__(self, items: List[FileComparisonItem], text_threshold: float, image_threshold: float, binary_threshold: float, max_workers: int | None = None):
+        """
+        Initialize item comparison worker.
+
+        Args:
+            items: Items to compare
+            text_threshold: Text similarity threshold
+            image_threshold: Image similarity threshold
+            binary_threshold: Binary similarity threshold
+            max_workers: Number of comparison threads (None for one per CPU)
+        """
+        super().__init__()
+        self.items = items
+        self.text_threshold = text_threshold
+        self.image_threshold = image_threshold
+        self.binary_threshold = binary_threshold
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self._should_stop = False
+
+    def stop(self):
+        """Stop the worker."""
+        self._should_stop = True
+
+    def run(self):
+        """Run the comparison."""
+        try:
+            self._compare_items(self.items)
+            total = len(self.items)
+            self.progress.emit(total, total, PROGRESS_DONE, "")
+
+        finally:
+            self.finished.emit()
+
+    def _compare_items(self, items: List[FileComparisonItem]):
+        """Compare items in parallel; results are emitted from this thread as they complete."""
+        total = len(items)
+        remaining = iter(items)
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            # Only a bounded number of items is submitted at a time, so huge trees do not queue a future per file
+            in_flight = {self._submit(executor, item): item for item in islice(remaining, self.max_workers * IN_FLIGHT_PER_WORKER)}
+
+            done = 0
+            last_progress = 0.0
+            while in_flight and not self._should_stop:
+                completed, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in completed:
+                    item = in_flight.pop(future)
+                    # Refill before handling the result so the pool stays busy
+                    next_item = next(remaining, None)
+                    if next_item is not None:
+                        in_flight[self._submit(executor, next_item)] = next_item
+
+                    results = future.result()
+                    item.results = results
+                    done += 1
+                    now = time.monotonic()
+                    if done == total or now - last_progress >= PROGRESS_INTERVAL:
+                        last_progress = now
+                        self.progress.emit(done, total, PROGRESS_COMPARING, item.name)
+                    self.comparison_complete.emit(item, results)
+
+            if self._should_stop:
+                executor.shutdown(cancel_futures=True)
+
+    def _submit(self, executor: ThreadPoolExecutor, item: FileComparisonItem):
+        """Submit the comparison of one item to the pool."""
+        return executor.submit(
+            _compare_item, item.paths, item.sizes, item.file_type, self.text_threshold, self.image_threshold, self.binary_threshold, item.mtimes
+        )
+
+
+class DirectoryComparisonWorker(ItemComparisonWorker):
+    """Worker thread for directory comparison."""
+
+    files_found = Signal(list)  # List[FileComparisonItem]
+
     def __init__(
         self,
         directories: List[Path],
         file_type_detector: FileTypeDetector,
         text_threshold: float,
         image_threshold: float,
-        binary_threshold: float
+        binary_threshold: float,
+        max_workers: int | None = None,
     ):
         """
         Initialize directory comparison worker.
@@ -56,18 +311,11 @@ class DirectoryComparisonWorker(QThread):
             text_threshold: Text similarity threshold
             image_threshold: Image similarity threshold
             binary_threshold: Binary similarity threshold
+            max_workers: Number of comparison threads (None for one per CPU)
         """
-        super().__init__()
+        super().__init__([], text_threshold, image_threshold, binary_threshold, max_workers)
         self.directories = directories
         self.detector = file_type_detector
-        self.text_threshold = text_threshold
-        self.image_threshold = image_threshold
-        self.binary_threshold = binary_threshold
-        self._should_stop = False
-
-    def stop(self):
-        """Stop the worker."""
-        self._should_stop = True
 
     def run(self):
         """Run the comparison."""
@@ -76,49 +324,46 @@ class DirectoryComparisonWorker(QThread):
             all_files = self._collect_files()
             total = len(all_files)
 
-            self.progress.emit(0, total, "ファイルを収集中...")
-
-            # Process each file
-            for idx, item in enumerate(all_files):
-                if self._should_stop:
-                    break
+            self.progress.emit(0, total, PROGRESS_COLLECTING, "")
 
-                self.progress.emit(idx, total, f"比較中: {item.name}")
-                self.file_found.emit(item)
+            for start in range(0, total, FOUND_BATCH_SIZE):
+                self.files_found.emit(all_files[start : start + FOUND_BATCH_SIZE])
 
-                # Compare files
-                results = self._compare_item(item)
-                item.results = results
-                self.comparison_complete.emit(item, results)
+            self._compare_items(all_files)
 
-            self.progress.emit(total, total, "完了")
+            self.progress.emit(total, total, PROGRESS_DONE, "")
 
         finally:
             self.finished.emit()
 
     def _collect_files(self) -> List[FileComparisonItem]:
         """Collect all files from directories."""
+        num_dirs = len(self.directories)
         # Map: relative_path -> list of absolute paths (or None)
         file_map = {}
+        # Map: relative_path -> list of file sizes (or None)
+        size_map = {}
+        empty_row = [None] * num_dirs
 
-        for dir_idx, directory in enumerate(self.directories):
-            for root, _, files in os.walk(directory):
-                root_path = Path(root)
-                rel_root = root_path.relative_to(directory)
+        # Walk each root on its own thread; roots often live on different disks
+        with ThreadPoolExecutor(max_workers=max(1, num_dirs)) as executor:
+            futures = {executor.submit(_walk_directory, directory): dir_idx for dir_idx, directory in enumerate(self.directories)}
 
-                for file in files:
-                    file_path = root_path / file
-                    rel_path = rel_root / file
-                    rel_path_str = str(rel_path)
+            for future in as_completed(futures):
+                dir_idx = futures[future]
+                for rel_path_str, (path, size) in future.result().items():
+                    paths = file_map.get(rel_path_str)
+                    if paths is None:
+                        paths = file_map[rel_path_str] = empty_row.copy()
+                        size_map[rel_path_str] = empty_row.copy()
 
-                    if rel_path_str not in file_map:
-                        file_map[rel_path_str] = [None] * len(self.directories)
-
-                    file_map[rel_path_str][dir_idx] = file_path
+                    paths[dir_idx] = path
+                    size_map[rel_path_str][dir_idx] = size
 
         # Create comparison items
         items = []
-        for rel_path, paths in sorted(file_map.items()):
+        for rel_path in sorted(file_map):
+            paths = file_map[rel_path]
             # Determine file type from first available file
             file_type = FileType.BINARY
             for path in paths:
@@ -126,38 +371,46 @@ class DirectoryComparisonWorker(QThread):
                     file_type = self.detector.detect(path)
                     break
 
-            items.append(FileComparisonItem(rel_path, paths, file_type))
+            items.append(FileComparisonItem(rel_path, paths, file_type, size_map[rel_path]))
 
         return items
 
-    def _compare_item(self, item: FileComparisonItem) -> List[ComparisonResult | None]:
+
+class DirectoryScanWorker(QThread):
+    """Worker thread that lists directories without comparing them."""
+
+    scan_finished = Signal(dict)  # relative path -> [ScanEntry | None per directory]
+
+    def __init__(self, directories: List[Path]):
         """
-        Compare files in the item.
+        Initialize directory scan worker.
 
-        Returns:
-            List of comparison results. For 2 files: [result], for 3 files: [result1_2, result2_3]
+        Args:
+            directories: List of directory paths to scan
         """
-        results = []
-
-        # Compare consecutive pairs
-        for i in range(len(item.paths) - 1):
-            path1 = item.paths[i]
-            path2 = item.paths[i + 1]
-
-            if path1 is None or path2 is None:
-                results.append(None)
-                continue
-
-            result = self._compare_files(path1, path2, item.file_type)
-            results.append(result)
-
-        return results
-
-    def _compare_files(self, file1: Path, file2: Path, file_type: FileType) -> ComparisonResult:
-        """Compare two files."""
-        if file_type == FileType.TEXT:
-            return TextComparator.compare(file1, file2, self.text_threshold)
-        elif file_type == FileType.IMAGE:
-            return ImageComparator.compare(file1, file2, self.image_threshold)
-        else:
-            return BinaryComparator.compare(file1, file2, self.binary_threshold)
+        super().__init__()
+        self.directories = directories
+        self._should_stop = False
+
+    def stop(self):
+        """Stop the worker; the scan result is discarded."""
+        self._should_stop = True
+
+    def run(self):
+        """Run the scan."""
+        num_dirs = len(self.directories)
+        # Map: relative_path -> list of scan entries (or None)
+        all_files: Dict[str, List[Optional[ScanEntry]]] = defaultdict(lambda: [None] * num_dirs)
+
+        # Walk each root on its own thread; scandir and stat release the GIL while waiting on the disk
+        with ThreadPoolExecutor(max_workers=max(1, num_dirs)) as executor:
+            futures = {executor.submit(_scan_directory, directory): dir_idx for dir_idx, directory in enumerate(self.directories)}
+
+            for future in as_completed(futures):
+                dir_idx = futures[future]
+                for rel_path_str, entry in future.result().items():
+                    # Interned keys are shared with the copies from the other roots and hash-compare by identity
+                    all_files[sys.intern(rel_path_str)][dir_idx] = entry
+
+        if not self._should_stop:
+            self.scan_finished.emit(dict(all_files))
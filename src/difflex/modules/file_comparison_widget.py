@@ -1,31 +1,28 @@
 """Simple file comparison widget."""
 
-import subprocess
 from pathlib import Path
 from typing import List
-from PySide6.QtWidgets import (
-    QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
-    QTableWidget, QTableWidgetItem, QHeaderView,
-    QAbstractItemView
-)
+from PySide6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QTableWidget, QTableWidgetItem, QHeaderView, QAbstractItemView
 from PySide6.QtCore import Qt
 from PySide6.QtGui import QColor
 
-from ..utils.file_types import FileTypeDetector, FileType
+from ..utils.file_types import FileType
 from ..utils.comparator import ComparisonResult, TextComparator, ImageComparator, BinaryComparator
 from ..utils.settings import Settings
 from ..utils.i18n import tr
+from ..utils.external_tool import build_tool_args, launch
+
+# Result text colors
+COLOR_IDENTICAL = QColor("#4CAF50")
+COLOR_SIMILAR_EXIF = QColor("#2196F3")
+COLOR_SIMILAR = QColor("#FFA500")
+COLOR_DIFFERENT = QColor("#F44336")
 
 
 class FileComparisonWidget(QWidget):
     """Widget for displaying file comparison."""
 
-    def __init__(
-        self,
-        paths: List[str],
-        settings: Settings,
-        parent=None
-    ):
+    def __init__(self, paths: List[str], settings: Settings, parent=None):
         """
         Initialize file comparison widget.
 
@@ -37,13 +34,11 @@ class FileComparisonWidget(QWidget):
         super().__init__(parent)
         self.paths = [Path(p) for p in paths]
         self.settings = settings
+        self._thresholds = (settings.get_text_similarity_threshold(), settings.get_image_similarity_threshold(), settings.get_binary_similarity_threshold())
 
         # Setup file type detector
-        text_exts = set(self.settings.get_text_extensions().split('\n'))
-        text_exts = {ext.strip() for ext in text_exts if ext.strip()}
-        image_exts = set(self.settings.get_image_extensions().split('\n'))
-        image_exts = {ext.strip() for ext in image_exts if ext.strip()}
-        self.detector = FileTypeDetector(text_exts, image_exts)
+        self.detector = self.settings.get_file_type_detector()
+        self._file_type = self.detector.detect(self.paths[0])
 
         self._setup_ui()
         self._compare_files()
@@ -53,9 +48,7 @@ class FileComparisonWidget(QWidget):
         layout = QVBoxLayout(self)
 
         # Header
-        header = QLabel(
-            tr("file_comparison_title", " vs ".join([p.name for p in self.paths]))
-        )
+        header = QLabel(tr("file_comparison_title", " vs ".join([p.name for p in self.paths])))
         header.setStyleSheet("font-weight: bold; font-size: 12px;")
         layout.addWidget(header)
 
@@ -75,7 +68,7 @@ class FileComparisonWidget(QWidget):
         headers = [tr("item")]
 
         for i in range(num_paths):
-            headers.append(tr("file_label", str(i+1)))
+            headers.append(tr("file_label", str(i + 1)))
             if i < num_paths - 1:
                 headers.append(tr("comparison_result"))
 
@@ -129,11 +122,9 @@ class FileComparisonWidget(QWidget):
                 self.table.setItem(row, col_idx, QTableWidgetItem(value))
 
         # Compare files
-        file_type = self.detector.detect(self.paths[0])
+        file_type = self._file_type
 
-        text_threshold = self.settings.get_text_similarity_threshold()
-        image_threshold = self.settings.get_image_similarity_threshold()
-        binary_threshold = self.settings.get_binary_similarity_threshold()
+        text_threshold, image_threshold, binary_threshold = self._thresholds
 
         # Comparison result row
         result_row = len(aspects)
@@ -161,16 +152,16 @@ class FileComparisonWidget(QWidget):
 
             if result.status == ComparisonResult.IDENTICAL:
                 result_item.setText(tr("identical"))
-                result_item.setForeground(QColor("#4CAF50"))
+                result_item.setForeground(COLOR_IDENTICAL)
             elif result.status == ComparisonResult.SIMILAR_EXIF:
                 result_item.setText(tr("similar_exif"))
-                result_item.setForeground(QColor("#2196F3"))
+                result_item.setForeground(COLOR_SIMILAR_EXIF)
             elif result.status == ComparisonResult.SIMILAR:
                 result_item.setText(tr("similar_with_percent", f"≒ {tr('similar')} ({result.similarity:.1f}%)"))
-                result_item.setForeground(QColor("#FFA500"))
+                result_item.setForeground(COLOR_SIMILAR)
             else:
                 result_item.setText(tr("different_with_percent", f"✗ {tr('different')} ({result.similarity:.1f}%)"))
-                result_item.setForeground(QColor("#F44336"))
+                result_item.setForeground(COLOR_DIFFERENT)
 
             result_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
             font = result_item.font()
@@ -190,14 +181,7 @@ class FileComparisonWidget(QWidget):
     def _open_in_external_tool(self):
         """Open files in external tool."""
         # Determine file type
-        file_type = self.detector.detect(self.paths[0])
-
-        if file_type == FileType.TEXT:
-            file_type_str = "text"
-        elif file_type == FileType.IMAGE:
-            file_type_str = "image"
-        else:
-            file_type_str = "binary"
+        file_type_str = self._file_type.value
 
         # Get external tool config
         config = self.settings.get_external_tool_config(file_type_str)
@@ -206,40 +190,8 @@ class FileComparisonWidget(QWidget):
         if not executable:
             return
 
-        # Build command
-        args = []
-
-        arg_before = config.get("arg_before", "").strip()
-        if arg_before:
-            args.append(arg_before)
-
-        arg_templates = [
-            config.get("arg1", "%s"),
-            config.get("arg2", "%s"),
-            config.get("arg3", "%s")
-        ]
-
-        pack_args = config.get("pack_args", False)
-        file_paths = [str(p) for p in self.paths]
-
-        if pack_args:
-            # Pack arguments (remove gaps)
-            for path in file_paths:
-                if path and arg_templates:
-                    template = arg_templates.pop(0)
-                    args.append(template.replace("%s", path))
-        else:
-            # Use arguments as-is
-            for i, (path, template) in enumerate(zip(file_paths, arg_templates)):
-                if i < len(file_paths) and file_paths[i]:
-                    args.append(template.replace("%s", file_paths[i]))
-
-        arg_after = config.get("arg_after", "").strip()
-        if arg_after:
-            args.append(arg_after)
-
         # Execute
         try:
-            subprocess.Popen([executable] + args)
+            launch(executable, build_tool_args(config, [str(p) for p in self.paths]))
         except Exception as e:
             print(f"Failed to open external tool: {e}")
@@ -1,39 +1,103 @@
 """History dialog for viewing comparison history."""
 
-from PySide6.QtWidgets import (
-    QDialog, QVBoxLayout, QHBoxLayout, QPushButton,
-    QTableWidget, QTableWidgetItem, QAbstractItemView, QHeaderView
-)
-from PySide6.QtCore import Signal
+from typing import Any
+from PySide6.QtWidgets import QDialog, QVBoxLayout, QHBoxLayout, QPushButton, QTableView, QAbstractItemView, QHeaderView
+from PySide6.QtCore import Qt, Signal, Slot, QAbstractTableModel, QModelIndex
 
 from ..utils.settings import Settings
 from ..utils.i18n import tr
 
 
+class HistoryModel(QAbstractTableModel):
+    """Table model over the comparison history list."""
+
+    def __init__(self, rows: list[dict[str, Any]] | None = None, parent=None):
+        """
+        Initialize history model.
+
+        Args:
+            rows: History entries as stored in settings
+            parent: Parent object
+        """
+        super().__init__(parent)
+        self._rows = rows or []
+        self._headers = [tr("type"), tr("path1"), tr("path2"), tr("path3")]
+        self._type_labels = {True: tr("type_directory"), False: tr("type_file")}
+
+    def rowCount(self, parent=QModelIndex()):
+        """Return number of rows."""
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        """Return number of columns."""
+        return 0 if parent.isValid() else len(self._headers)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        """Return header labels."""
+        if orientation == Qt.Orientation.Horizontal and role == Qt.ItemDataRole.DisplayRole:
+            return self._headers[section]
+        return None
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        """Return cell text."""
+        if not index.isValid() or role != Qt.ItemDataRole.DisplayRole:
+            return None
+
+        entry = self._rows[index.row()]
+        column = index.column()
+
+        # Type
+        if column == 0:
+            return self._type_labels[bool(entry.get("is_directory", False))]
+
+        # Paths
+        paths = entry.get("paths", [])
+        return paths[column - 1] if column - 1 < len(paths) else ""
+
+    def set_rows(self, rows: list[dict[str, Any]]):
+        """
+        Replace all history entries.
+
+        Args:
+            rows: New history entries
+        """
+        self.beginResetModel()
+        self._rows = rows
+        self.endResetModel()
+
+
 class HistoryDialog(QDialog):
     """Dialog for viewing comparison history."""
 
     compare_requested = Signal(list, bool)  # paths, is_directory
 
-    def __init__(self, parent=None):
-        """Initialize history dialog."""
+    def __init__(self, parent=None, settings: Settings | None = None):
+        """
+        Initialize history dialog.
+
+        Args:
+            parent: Parent widget
+            settings: Shared settings object (a new one is created if omitted)
+        """
         super().__init__(parent)
         self.setWindowTitle(tr("history_title"))
         self.setMinimumSize(700, 400)
-        self.settings = Settings()
+        self.settings = settings if settings is not None else Settings()
+        self._history: list[dict[str, Any]] = []
+        self._loaded = False
         self._setup_ui()
-        self._load_history()
 
     def _setup_ui(self):
         """Setup user interface."""
         layout = QVBoxLayout(self)
 
         # Table
-        self.table = QTableWidget()
-        self.table.setColumnCount(4)
-        self.table.setHorizontalHeaderLabels([tr("type"), tr("path1"), tr("path2"), tr("path3")])
+        self.model = HistoryModel(self._history, self)
+        self.table = QTableView()
+        self.table.setModel(self.model)
         self.table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
         self.table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.table.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
         self.table.horizontalHeader().setStretchLastSection(True)
         self.table.horizontalHeader().setSectionResizeMode(1, QHeaderView.ResizeMode.Stretch)
         self.table.horizontalHeader().setSectionResizeMode(2, QHeaderView.ResizeMode.Stretch)
@@ -60,47 +124,43 @@ class HistoryDialog(QDialog):
 
         layout.addLayout(button_layout)
 
+    def showEvent(self, event):
+        """Load history on first show."""
+        super().showEvent(event)
+        if not self._loaded:
+            self._loaded = True
+            self._load_history()
+
     def _load_history(self):
         """Load history from settings."""
-        history = self.settings.get_comparison_history()
-
-        self.table.setRowCount(len(history))
-
-        for row, item in enumerate(history):
-            is_dir = item.get("is_directory", False)
-            paths = item.get("paths", [])
-
-            # Type
-            type_item = QTableWidgetItem(tr("type_directory") if is_dir else tr("type_file"))
-            self.table.setItem(row, 0, type_item)
-
-            # Paths
-            for i in range(3):
-                path = paths[i] if i < len(paths) else ""
-                self.table.setItem(row, 1 + i, QTableWidgetItem(path))
+        self._history = self.settings.get_comparison_history()
+        self.model.set_rows(self._history)
 
+    @Slot(QModelIndex)
     def _on_row_double_clicked(self, _index):
         """Handle row double click."""
         self._rerun_comparison()
 
+    @Slot()
     def _rerun_comparison(self):
         """Rerun selected comparison."""
-        current_row = self.table.currentRow()
+        current_row = self.table.currentIndex().row()
         if current_row < 0:
             return
 
-        history = self.settings.get_comparison_history()
-        if current_row >= len(history):
+        if current_row >= len(self._history):
             return
 
-        item = history[current_row]
+        item = self._history[current_row]
         paths = item.get("paths", [])
         is_directory = item.get("is_directory", False)
 
         self.compare_requested.emit(paths, is_directory)
         self.accept()
 
+    @Slot()
     def _clear_history(self):
         """Clear history."""
         self.settings.set_comparison_history([])
-        self.table.setRowCount(0)
+        self._history = []
+        self.model.set_rows(self._history)
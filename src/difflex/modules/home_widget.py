@@ -1,11 +1,8 @@
 """Home screen widget for starting new comparisons."""
 
 from pathlib import Path
-from PySide6.QtWidgets import (
-    QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
-    QLineEdit, QFileDialog, QGroupBox
-)
-from PySide6.QtCore import Signal, Qt
+from PySide6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QLineEdit, QFileDialog, QGroupBox
+from PySide6.QtCore import Signal, Slot, Qt, QTimer
 
 from ..utils.i18n import tr
 
@@ -35,10 +32,7 @@ class PathInputWidget(QWidget):
 
         # Line edit
         self.line_edit = QLineEdit()
-        self.line_edit.setPlaceholderText(
-            tr("file_placeholder") if is_file
-            else tr("directory_placeholder")
-        )
+        self.line_edit.setPlaceholderText(tr("file_placeholder") if is_file else tr("directory_placeholder"))
         self.line_edit.setAcceptDrops(True)
         self.line_edit.dragEnterEvent = self._drag_enter_event
         self.line_edit.dropEvent = self._drop_event
@@ -69,20 +63,13 @@ class PathInputWidget(QWidget):
                 self.line_edit.setText(path)
                 event.acceptProposedAction()
 
+    @Slot()
     def _browse(self):
         """Open file/directory browser."""
         if self.is_file:
-            path, _ = QFileDialog.getOpenFileName(
-                self,
-                tr("select_file"),
-                "",
-                tr("all_files")
-            )
+            path, _ = QFileDialog.getOpenFileName(self, tr("select_file"), "", tr("all_files"))
         else:
-            path = QFileDialog.getExistingDirectory(
-                self,
-                tr("select_directory")
-            )
+            path = QFileDialog.getExistingDirectory(self, tr("select_directory"))
 
         if path:
             self.line_edit.setText(path)
@@ -95,6 +82,7 @@ class PathInputWidget(QWidget):
         """Set the path."""
         self.line_edit.setText(path)
 
+    @Slot()
     def clear(self):
         """Clear the path."""
         self.line_edit.clear()
@@ -109,7 +97,19 @@ class HomeWidget(QWidget):
     def __init__(self, parent=None):
         """Initialize home widget."""
         super().__init__(parent)
+
+        # Last applied button states (None until first update)
+        self._file_btn_enabled: bool | None = None
+        self._dir_btn_enabled: bool | None = None
+
+        # Collapse bursts of textChanged (typing, paste, drop) into one button update
+        self._update_timer = QTimer(self)
+        self._update_timer.setSingleShot(True)
+        self._update_timer.setInterval(30)
+        self._update_timer.timeout.connect(self._update_buttons)
+
         self._setup_ui()
+        self._update_buttons()
 
     def _setup_ui(self):
         """Setup user interface."""
@@ -127,12 +127,13 @@ class HomeWidget(QWidget):
 
         self.file_inputs = []
         for i in range(3):
-            input_widget = PathInputWidget(tr("file_label", str(i+1)), is_file=True)
+            input_widget = PathInputWidget(tr("file_label", str(i + 1)), is_file=True)
+            input_widget.line_edit.textChanged.connect(self._schedule_update_buttons)
             self.file_inputs.append(input_widget)
             file_layout.addWidget(input_widget)
 
         self.file_compare_btn = QPushButton(tr("start_file_comparison"))
-        self.file_compare_btn.clicked.connect(self._start_file_comparison)
+        self.file_compare_btn.clicked.connect(self._start_file_comparison, Qt.ConnectionType.UniqueConnection)
         file_layout.addWidget(self.file_compare_btn)
 
         layout.addWidget(file_group)
@@ -143,12 +144,13 @@ class HomeWidget(QWidget):
 
         self.dir_inputs = []
         for i in range(3):
-            input_widget = PathInputWidget(tr("directory_label", str(i+1)), is_file=False)
+            input_widget = PathInputWidget(tr("directory_label", str(i + 1)), is_file=False)
+            input_widget.line_edit.textChanged.connect(self._schedule_update_buttons)
             self.dir_inputs.append(input_widget)
             dir_layout.addWidget(input_widget)
 
         self.dir_compare_btn = QPushButton(tr("start_directory_comparison"))
-        self.dir_compare_btn.clicked.connect(self._start_dir_comparison)
+        self.dir_compare_btn.clicked.connect(self._start_dir_comparison, Qt.ConnectionType.UniqueConnection)
         dir_layout.addWidget(self.dir_compare_btn)
 
         layout.addWidget(dir_group)
@@ -160,28 +162,42 @@ class HomeWidget(QWidget):
         history_btn.clicked.connect(self.history_requested.emit)
         layout.addWidget(history_btn)
 
+    @Slot()
+    def _schedule_update_buttons(self):
+        """Schedule a button state update, restarting any pending one."""
+        self._update_timer.start()
+
+    @Slot()
     def _update_buttons(self):
         """Update button states based on inputs."""
         # Check file inputs
-        file_paths = [inp.get_path() for inp in self.file_inputs if inp.get_path()]
-        self.file_compare_btn.setEnabled(len(file_paths) >= 2)
+        file_paths = [p for p in (inp.get_path() for inp in self.file_inputs) if p]
+        enabled = len(file_paths) >= 2
+        if enabled != self._file_btn_enabled:
+            self.file_compare_btn.setEnabled(enabled)
+            self._file_btn_enabled = enabled
 
         # Check directory inputs
-        dir_paths = [inp.get_path() for inp in self.dir_inputs if inp.get_path()]
-        self.dir_compare_btn.setEnabled(len(dir_paths) >= 2)
+        dir_paths = [p for p in (inp.get_path() for inp in self.dir_inputs) if p]
+        enabled = len(dir_paths) >= 2
+        if enabled != self._dir_btn_enabled:
+            self.dir_compare_btn.setEnabled(enabled)
+            self._dir_btn_enabled = enabled
 
+    @Slot()
     def _start_file_comparison(self):
         """Start file comparison."""
-        paths = [inp.get_path() for inp in self.file_inputs if inp.get_path()]
+        paths = [p for p in (inp.get_path() for inp in self.file_inputs) if p]
         if len(paths) >= 2:
             self.compare_requested.emit(paths, False)
             # Clear inputs
             for inp in self.file_inputs:
                 inp.clear()
 
+    @Slot()
     def _start_dir_comparison(self):
         """Start directory comparison."""
-        paths = [inp.get_path() for inp in self.dir_inputs if inp.get_path()]
+        paths = [p for p in (inp.get_path() for inp in self.dir_inputs) if p]
         if len(paths) >= 2:
             self.compare_requested.emit(paths, True)
             # Clear inputs
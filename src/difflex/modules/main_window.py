@@ -1,27 +1,139 @@
 """Main window for difflex application."""
 
-from PySide6.QtWidgets import QMainWindow, QTabWidget, QMessageBox
-from PySide6.QtGui import QAction
+import os.path
+import weakref
+from functools import partial
+from PySide6.QtWidgets import QApplication, QMainWindow, QTabWidget, QMessageBox, QWidget
+from PySide6.QtCore import Qt, Slot, QTimer
+from PySide6.QtGui import QAction, QColor, QPalette
 
 from ..utils.settings import Settings
 from ..utils.i18n import tr
 from .home_widget import HomeWidget
-from .file_comparison_widget import FileComparisonWidget
-from .parallel_comparison_widget import ParallelComparisonWidget
-from .settings_dialog import SettingsDialog
-from .history_dialog import HistoryDialog
+
+# Dark mode colors, applied through the application palette
+DARK_PALETTE_COLORS = {
+    QPalette.ColorRole.Window: "#2b2b2b",
+    QPalette.ColorRole.WindowText: "#ffffff",
+    QPalette.ColorRole.Base: "#3c3c3c",
+    QPalette.ColorRole.AlternateBase: "#404040",
+    QPalette.ColorRole.Text: "#ffffff",
+    QPalette.ColorRole.Button: "#505050",
+    QPalette.ColorRole.ButtonText: "#ffffff",
+    QPalette.ColorRole.ToolTipBase: "#3c3c3c",
+    QPalette.ColorRole.ToolTipText: "#ffffff",
+    QPalette.ColorRole.PlaceholderText: "#888888",
+    QPalette.ColorRole.Highlight: "#0078d4",
+    QPalette.ColorRole.HighlightedText: "#ffffff",
+}
+
+# Stylesheet for the dark mode details the palette cannot express
+DARK_STYLESHEET = """
+QHeaderView::section {
+    background-color: #505050;
+    color: #ffffff;
+    padding: 5px;
+    border: 1px solid #666666;
+}
+QPushButton {
+    background-color: #505050;
+    border: 1px solid #666666;
+    padding: 5px 15px;
+    border-radius: 3px;
+}
+QPushButton:hover {
+    background-color: #606060;
+}
+QPushButton:pressed {
+    background-color: #404040;
+}
+QPushButton:disabled {
+    background-color: #3c3c3c;
+    color: #888888;
+}
+QLineEdit, QTextEdit, QPlainTextEdit, QSpinBox {
+    border: 1px solid #666666;
+    padding: 3px;
+}
+QGroupBox {
+    border: 1px solid #666666;
+    border-radius: 5px;
+    margin-top: 10px;
+    padding-top: 10px;
+}
+QGroupBox::title {
+    subcontrol-origin: margin;
+    subcontrol-position: top left;
+    padding: 0 5px;
+}
+QTabWidget::pane {
+    border: 1px solid #666666;
+}
+QTabBar::tab {
+    background-color: #505050;
+    padding: 5px 10px;
+    border: 1px solid #666666;
+}
+QTabBar::tab:selected {
+    background-color: #2b2b2b;
+}
+QProgressBar {
+    border: 1px solid #666666;
+    border-radius: 3px;
+    text-align: center;
+}
+QProgressBar::chunk {
+    background-color: #0078d4;
+}
+QMenu {
+    border: 1px solid #666666;
+}
+"""
+
+# Stylesheet applied in light mode (native look)
+LIGHT_STYLESHEET = ""
+
+# Menu bar layout: (title key, [(action key, slot name) or None for a separator])
+MENUS = [
+    ("menu_file", [("menu_new_comparison", "_new_comparison"), ("menu_history", "_show_history"), None, ("menu_exit", "close")]),
+    ("menu_settings", [("menu_settings", "_show_settings")]),
+    ("menu_help", [("menu_about", "_show_about")]),
+]
 
 
 class MainWindow(QMainWindow):
     """Main application window."""
 
-    def __init__(self):
-        """Initialize main window."""
+    def __init__(self, settings: Settings | None = None):
+        """
+        Initialize main window.
+
+        Args:
+            settings: Shared settings object (a new one is created if omitted)
+        """
         super().__init__()
         self.setWindowTitle(tr("app_title"))
         self.setMinimumSize(1000, 600)
 
-        self.settings = Settings()
+        self.settings = settings if settings is not None else Settings()
+        self._tab_home_label = tr("tab_home")
+        self._home_widget: HomeWidget | None = None
+        # Directory comparison widgets that may own a worker thread; closed tabs drop out on their own
+        self._comparison_widgets: weakref.WeakSet[QWidget] = weakref.WeakSet()
+        # Built on first open and reused afterwards
+        self._settings_dialog = None
+        self._dark_palette: QPalette | None = None
+        # Platform palette as the application started, restored in light mode to keep system accent and contrast colors
+        self._system_palette = QPalette(QApplication.instance().palette())
+        self._applied_dark_mode: bool | None = None
+        # Dark mode setting as last read; cleared when the settings dialog is accepted
+        self._dark_mode_cache: bool | None = None
+
+        # Coalesce theme re-application requests into one restyle
+        self._theme_timer = QTimer(self)
+        self._theme_timer.setSingleShot(True)
+        self._theme_timer.setInterval(30)
+        self._theme_timer.timeout.connect(self._apply_theme)
         self._setup_ui()
         self._apply_theme()
 
@@ -29,67 +141,65 @@ class MainWindow(QMainWindow):
         """Setup user interface."""
         # Menu bar
         menubar = self.menuBar()
-
-        # File menu
-        file_menu = menubar.addMenu(tr("menu_file"))
-
-        new_tab_action = QAction(tr("menu_new_comparison"), self)
-        new_tab_action.triggered.connect(self._new_comparison)
-        file_menu.addAction(new_tab_action)
-
-        history_action = QAction(tr("menu_history"), self)
-        history_action.triggered.connect(self._show_history)
-        file_menu.addAction(history_action)
-
-        file_menu.addSeparator()
-
-        exit_action = QAction(tr("menu_exit"), self)
-        exit_action.triggered.connect(self.close)
-        file_menu.addAction(exit_action)
-
-        # Settings menu
-        settings_menu = menubar.addMenu(tr("menu_settings"))
-
-        settings_action = QAction(tr("menu_settings"), self)
-        settings_action.triggered.connect(self._show_settings)
-        settings_menu.addAction(settings_action)
-
-        # Help menu
-        help_menu = menubar.addMenu(tr("menu_help"))
-
-        about_action = QAction(tr("menu_about"), self)
-        about_action.triggered.connect(self._show_about)
-        help_menu.addAction(about_action)
+        for title_key, entries in MENUS:
+            menu = menubar.addMenu(tr(title_key))
+            for entry in entries:
+                if entry is None:
+                    menu.addSeparator()
+                else:
+                    text_key, slot_name = entry
+                    self._add_action(menu, tr(text_key), getattr(self, slot_name))
 
         # Tab widget
         self.tabs = QTabWidget()
         self.tabs.setTabsClosable(True)
+        self.tabs.setDocumentMode(True)
+        self.tabs.setElideMode(Qt.TextElideMode.ElideRight)
+        self.tabs.tabBar().setUsesScrollButtons(True)
+        self.tabs.tabBar().setExpanding(False)
         self.tabs.tabCloseRequested.connect(self._close_tab)
         self.setCentralWidget(self.tabs)
 
         # Add home tab
         self._add_home_tab()
 
+    def _add_action(self, menu, text: str, slot) -> QAction:
+        """
+        Create a menu action connected to a slot.
+
+        Args:
+            menu: Menu to add the action to
+            text: Action text
+            slot: Slot invoked when the action is triggered
+
+        Returns:
+            Created action
+        """
+        action = QAction(text, self)
+        action.triggered.connect(slot)
+        menu.addAction(action)
+        return action
+
     def _add_home_tab(self):
         """Add home tab."""
         home_widget = HomeWidget()
-        home_widget.compare_requested.connect(self._start_comparison)
-        home_widget.history_requested.connect(self._show_history)
+        home_widget.compare_requested.connect(self._start_comparison, Qt.ConnectionType.UniqueConnection)
+        home_widget.history_requested.connect(self._show_history, Qt.ConnectionType.UniqueConnection)
 
-        self.tabs.addTab(home_widget, tr("tab_home"))
+        self.tabs.addTab(home_widget, self._tab_home_label)
+        self._home_widget = home_widget
 
+    @Slot()
     def _new_comparison(self):
         """Create new comparison (go to home tab)."""
-        # Check if home tab exists
-        for i in range(self.tabs.count()):
-            if self.tabs.tabText(i) == tr("tab_home"):
-                self.tabs.setCurrentIndex(i)
-                return
-
-        # Add new home tab
-        self._add_home_tab()
-        self.tabs.setCurrentIndex(self.tabs.count() - 1)
+        # The home tab cannot be closed, so it only needs to be re-created if it went missing
+        index = self.tabs.indexOf(self._home_widget)
+        if index < 0:
+            self._add_home_tab()
+            index = self.tabs.count() - 1
+        self.tabs.setCurrentIndex(index)
 
+    @Slot(list, bool)
     def _start_comparison(self, paths: list, is_directory: bool):
         """
         Start a new comparison.
@@ -98,22 +208,24 @@ class MainWindow(QMainWindow):
             paths: List of file or directory paths
             is_directory: True if comparing directories
         """
-        # Add to history
-        history_item = {
-            "paths": paths,
-            "is_directory": is_directory
-        }
-        self.settings.add_to_history(history_item)
-
-        # Create comparison widget based on type
+        # Add to history once control returns to the event loop, after the tab is built
+        history_item = {"paths": paths, "is_directory": is_directory}
+        QTimer.singleShot(0, partial(self.settings.add_to_history, history_item))
+
+        # Create comparison widget based on type; imported here to keep startup light
         if is_directory:
+            from .parallel_comparison_widget import ParallelComparisonWidget
+
             comparison_widget = ParallelComparisonWidget(paths, self.settings)
+            self._comparison_widgets.add(comparison_widget)
         else:
+            from .file_comparison_widget import FileComparisonWidget
+
             comparison_widget = FileComparisonWidget(paths, self.settings)
 
         # Create tab title
-        from pathlib import Path
-        names = [Path(p).name for p in paths[:2]]
+        # normpath drops trailing separators that directory paths often carry
+        names = [os.path.basename(os.path.normpath(p)) for p in paths[:2]]
         title = f"{names[0]} vs {names[1]}"
         if len(paths) > 2:
             title += "..."
@@ -122,157 +234,92 @@ class MainWindow(QMainWindow):
         index = self.tabs.addTab(comparison_widget, title)
         self.tabs.setCurrentIndex(index)
 
+    @Slot(int)
     def _close_tab(self, index: int):
         """Close a tab."""
         # Don't close if it's the last tab
         if self.tabs.count() <= 1:
             return
 
-        # Don't close home tab if there are other tabs
-        if self.tabs.tabText(index) == tr("tab_home") and self.tabs.count() > 1:
-            # Check if there are other home tabs
-            home_count = sum(1 for i in range(self.tabs.count()) if self.tabs.tabText(i) == tr("tab_home"))
-            if home_count <= 1:
-                return
-
+        # Don't close the home tab
         widget = self.tabs.widget(index)
+        if widget is self._home_widget:
+            return
+
         self.tabs.removeTab(index)
         if widget:
             widget.deleteLater()
 
+    @Slot()
     def _show_settings(self):
         """Show settings dialog."""
-        dialog = SettingsDialog(self)
-        dialog.language_changed.connect(self._on_language_changed)
-        if dialog.exec():
-            self._apply_theme()
+        if self._settings_dialog is None:
+            from .settings_dialog import SettingsDialog
 
+            self._settings_dialog = SettingsDialog(self, settings=self.settings)
+            self._settings_dialog.language_changed.connect(self._on_language_changed)
+        else:
+            # Discard edits left over from a cancelled previous open
+            self._settings_dialog.reload()
+        if self._settings_dialog.exec():
+            self._dark_mode_cache = None
+            self._theme_timer.start()
+
+    @Slot()
     def _on_language_changed(self):
         """Handle language change by showing restart message."""
-        QMessageBox.information(
-            self,
-            tr("language_changed_title"),
-            tr("language_changed_message")
-        )
+        QMessageBox.information(self, tr("language_changed_title"), tr("language_changed_message"))
 
+    @Slot()
     def _show_history(self):
         """Show history dialog."""
-        dialog = HistoryDialog(self)
-        dialog.compare_requested.connect(self._start_comparison)
+        from .history_dialog import HistoryDialog
+
+        dialog = HistoryDialog(self, settings=self.settings)
+        dialog.compare_requested.connect(self._start_comparison, Qt.ConnectionType.UniqueConnection)
         dialog.exec()
 
+    @Slot()
     def _show_about(self):
         """Show about dialog."""
-        QMessageBox.about(
-            self,
-            tr("about_title"),
-            tr("about_text")
-        )
+        QMessageBox.about(self, tr("about_title"), tr("about_text"))
 
+    @Slot()
     def _apply_theme(self):
         """Apply theme based on settings."""
-        dark_mode = self.settings.get_dark_mode()
+        if self._dark_mode_cache is None:
+            self._dark_mode_cache = self.settings.get_dark_mode()
+        dark_mode = self._dark_mode_cache
+        if dark_mode == self._applied_dark_mode:
+            return
+        self._applied_dark_mode = dark_mode
+        app = QApplication.instance()
 
         if dark_mode:
-            self.setStyleSheet("""
-                QMainWindow, QDialog, QWidget {
-                    background-color: #2b2b2b;
-                    color: #ffffff;
-                }
-                QTableWidget {
-                    background-color: #3c3c3c;
-                    alternate-background-color: #404040;
-                    gridline-color: #555555;
-                }
-                QHeaderView::section {
-                    background-color: #505050;
-                    color: #ffffff;
-                    padding: 5px;
-                    border: 1px solid #666666;
-                }
-                QPushButton {
-                    background-color: #505050;
-                    color: #ffffff;
-                    border: 1px solid #666666;
-                    padding: 5px 15px;
-                    border-radius: 3px;
-                }
-                QPushButton:hover {
-                    background-color: #606060;
-                }
-                QPushButton:pressed {
-                    background-color: #404040;
-                }
-                QPushButton:disabled {
-                    background-color: #3c3c3c;
-                    color: #888888;
-                }
-                QLineEdit, QTextEdit, QSpinBox {
-                    background-color: #3c3c3c;
-                    color: #ffffff;
-                    border: 1px solid #666666;
-                    padding: 3px;
-                }
-                QGroupBox {
-                    border: 1px solid #666666;
-                    border-radius: 5px;
-                    margin-top: 10px;
-                    padding-top: 10px;
-                }
-                QGroupBox::title {
-                    color: #ffffff;
-                    subcontrol-origin: margin;
-                    subcontrol-position: top left;
-                    padding: 0 5px;
-                }
-                QTabWidget::pane {
-                    border: 1px solid #666666;
-                    background-color: #2b2b2b;
-                }
-                QTabBar::tab {
-                    background-color: #505050;
-                    color: #ffffff;
-                    padding: 5px 10px;
-                    border: 1px solid #666666;
-                }
-                QTabBar::tab:selected {
-                    background-color: #2b2b2b;
-                }
-                QProgressBar {
-                    border: 1px solid #666666;
-                    border-radius: 3px;
-                    text-align: center;
-                    background-color: #3c3c3c;
-                }
-                QProgressBar::chunk {
-                    background-color: #0078d4;
-                }
-                QMenuBar {
-                    background-color: #2b2b2b;
-                    color: #ffffff;
-                }
-                QMenuBar::item:selected {
-                    background-color: #505050;
-                }
-                QMenu {
-                    background-color: #2b2b2b;
-                    color: #ffffff;
-                    border: 1px solid #666666;
-                }
-                QMenu::item:selected {
-                    background-color: #505050;
-                }
-            """)
+            app.setPalette(self._get_dark_palette())
         else:
-            self.setStyleSheet("")
+            app.setPalette(self._system_palette)
+        # Set on the application so new dialogs and tabs resolve it without walking up to this window
+        app.setStyleSheet(DARK_STYLESHEET if dark_mode else LIGHT_STYLESHEET)
+
+    def _get_dark_palette(self) -> QPalette:
+        """Get the dark mode palette, building it on first use."""
+        if self._dark_palette is None:
+            palette = QPalette(QApplication.instance().style().standardPalette())
+            for role, color in DARK_PALETTE_COLORS.items():
+                palette.setColor(role, QColor(color))
+            palette.setColor(QPalette.ColorGroup.Disabled, QPalette.ColorRole.Text, QColor("#888888"))
+            palette.setColor(QPalette.ColorGroup.Disabled, QPalette.ColorRole.ButtonText, QColor("#888888"))
+            self._dark_palette = palette
+        return self._dark_palette
 
     def closeEvent(self, event):
         """Handle close event."""
-        # Stop all comparison workers
-        for i in range(self.tabs.count()):
-            widget = self.tabs.widget(i)
-            if isinstance(widget, ParallelComparisonWidget) and hasattr(widget, 'worker') and widget.worker:
-                widget.worker.stop()
-                widget.worker.wait()
+        # Stop all comparison workers first so they wind down concurrently, then wait
+        workers = [widget.worker for widget in self._comparison_widgets if widget.worker]
+        for worker in workers:
+            worker.stop()
+        for worker in workers:
+            worker.wait()
 
         event.accept()
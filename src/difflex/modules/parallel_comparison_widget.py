@@ -1,20 +1,74 @@
 """Parallel directory comparison widget with synchronized scrolling."""
 
-import subprocess
+import os
+import time
 from pathlib import Path
 from typing import List, Dict, Optional, Set
 from PySide6.QtWidgets import (
-    QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
-    QTreeWidget, QTreeWidgetItem, QProgressBar, QHeaderView,
-    QAbstractItemView, QSplitter
+    QWidget,
+    QVBoxLayout,
+    QHBoxLayout,
+    QLabel,
+    QPushButton,
+    QTreeWidget,
+    QTreeWidgetItem,
+    QProgressBar,
+    QHeaderView,
+    QAbstractItemView,
+    QSplitter,
 )
-from PySide6.QtCore import Qt, Signal
+from PySide6.QtCore import Qt, Signal, QTimer
 from PySide6.QtGui import QColor, QFont
 
-from ..utils.file_types import FileTypeDetector, FileType
+from ..utils.file_types import FileType
 from ..utils.comparator import ComparisonResult
 from ..utils.settings import Settings
 from ..utils.i18n import tr
+from ..utils.external_tool import build_tool_args, launch
+from .comparison_worker import DirectoryScanWorker, ItemComparisonWorker, FileComparisonItem, ScanEntry
+
+# Item text colors
+COLOR_DIRECTORY = QColor("#6495ED")
+COLOR_EXISTS_DARK = QColor("#FFFFFF")
+COLOR_EXISTS_LIGHT = QColor("#000000")
+COLOR_MISSING = QColor("#888888")
+
+# Result text colors
+COLOR_IDENTICAL = QColor("#4CAF50")
+COLOR_SIMILAR_EXIF = QColor("#2196F3")
+COLOR_SIMILAR = QColor("#FFA500")
+COLOR_DIFFERENT = QColor("#F44336")
+
+# Symbol, color and tooltip translation key (None for no tooltip) of each comparison status; tooltips are formatted with the similarity
+RESULT_STYLES = {
+    ComparisonResult.IDENTICAL: ("=", COLOR_IDENTICAL, None),
+    ComparisonResult.SIMILAR_EXIF: ("≒", COLOR_SIMILAR_EXIF, "similar_exif_tooltip"),
+    ComparisonResult.SIMILAR: ("≒", COLOR_SIMILAR, "similar_tooltip"),
+    ComparisonResult.DIFFERENT: ("≠", COLOR_DIFFERENT, "different_tooltip"),
+}
+
+# File size units: (suffix, bytes per unit, decimal places); each unit is 2**10 times the previous one
+SIZE_UNITS = (("B", 1, 0), ("KB", 1024, 1), ("MB", 1024**2, 1), ("GB", 1024**3, 2))
+# Modified time display format
+MTIME_FORMAT = "%Y/%m/%d %H:%M:%S"
+# Alignment of the size column
+SIZE_ALIGNMENT = Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter
+
+
+def _format_size(size: int) -> str:
+    """
+    Format a file size with the largest unit not exceeding it.
+
+    Args:
+        size: Size in bytes
+
+    Returns:
+        Formatted size such as "12 B" or "3.4 MB"
+    """
+    unit, divisor, decimals = SIZE_UNITS[min(max(size.bit_length() - 1, 0) // 10, len(SIZE_UNITS) - 1)]
+    if not decimals:
+        return f"{size} {unit}"
+    return f"{size / divisor:.{decimals}f} {unit}"
 
 
 class SyncTreeWidget(QTreeWidget):
@@ -31,12 +85,7 @@ class SyncTreeWidget(QTreeWidget):
 class ParallelComparisonWidget(QWidget):
     """Widget for parallel directory comparison with synchronized views."""
 
-    def __init__(
-        self,
-        paths: List[str],
-        settings: Settings,
-        parent=None
-    ):
+    def __init__(self, paths: List[str], settings: Settings, parent=None):
         """
         Initialize parallel comparison widget.
 
@@ -51,13 +100,34 @@ class ParallelComparisonWidget(QWidget):
         self.worker = None
         self.items_map: Dict[str, Dict[str | int, QTreeWidgetItem]] = {}  # path -> {tree_idx or "result_N": item}
         self.pending_comparisons: Set[str] = set()  # Paths pending comparison
+        self._scan_entries: Dict[str, List[Optional[ScanEntry]]] = {}  # path -> scan entry per directory
+        self._exists_color = COLOR_EXISTS_LIGHT
+
+        # Fonts shared by all items; fonts need the application, so they are built here rather than at import
+        self._directory_font = QFont()
+        self._directory_font.setBold(True)
+        self._missing_font = QFont("", -1, QFont.Weight.Light, True)  # Italic
+        self._result_font = QFont()
+        self._result_font.setBold(True)
+        self._result_font.setPointSize(14)
+        self._pending_scroll = 0
+
+        # Coalesce scroll events so a burst of wheel steps is synchronized once per event loop pass
+        self._scroll_timer = QTimer(self)
+        self._scroll_timer.setSingleShot(True)
+        self._scroll_timer.setInterval(0)
+        self._scroll_timer.timeout.connect(self._do_sync_scroll)
+
+        # Apply comparison results at most about 30 times per second
+        self._pending_results: List[FileComparisonItem] = []
+        self._result_timer = QTimer(self)
+        self._result_timer.setSingleShot(True)
+        self._result_timer.setInterval(33)
+        self._result_timer.timeout.connect(self._flush_results)
 
         # Setup file type detector
-        text_exts = set(self.settings.get_text_extensions().split('\n'))
-        text_exts = {ext.strip() for ext in text_exts if ext.strip()}
-        image_exts = set(self.settings.get_image_extensions().split('\n'))
-        image_exts = {ext.strip() for ext in image_exts if ext.strip()}
-        self.detector = FileTypeDetector(text_exts, image_exts)
+        self.detector = self.settings.get_file_type_detector()
+        self._file_types: Dict[str, FileType] = {}  # lower-case extension -> detected type
 
         self._setup_ui()
         self._scan_directories()
@@ -92,13 +162,10 @@ class ParallelComparisonWidget(QWidget):
             # Directory tree with multiple columns
             tree = SyncTreeWidget()
             tree.setColumnCount(3)  # Name, Size, Modified
-            tree.setHeaderLabels([
-                tr("name"),
-                tr("file_size"),
-                tr("modified_date")
-            ])
+            tree.setHeaderLabels([tr("name"), tr("file_size"), tr("modified_date")])
             tree.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
             tree.setAlternatingRowColors(True)
+            tree.setUniformRowHeights(True)
             tree.itemDoubleClicked.connect(self._on_item_double_clicked)
             tree.itemExpanded.connect(lambda item, idx=i: self._on_item_expanded(item, idx))
             tree.itemCollapsed.connect(lambda item, idx=i: self._on_item_collapsed(item, idx))
@@ -111,9 +178,7 @@ class ParallelComparisonWidget(QWidget):
             tree.setColumnWidth(2, 150)  # Modified column
 
             # Synchronize vertical scrolling
-            tree.verticalScrollBar().valueChanged.connect(
-                lambda value, idx=i: self._sync_scroll(value, idx)
-            )
+            tree.verticalScrollBar().valueChanged.connect(lambda value, idx=i: self._sync_scroll(value, idx))
 
             self.trees.append(tree)
             splitter.addWidget(tree)
@@ -125,12 +190,11 @@ class ParallelComparisonWidget(QWidget):
                 result_tree.setMaximumWidth(120)
                 result_tree.setMinimumWidth(80)
                 result_tree.setAlternatingRowColors(True)
+                result_tree.setUniformRowHeights(True)
                 result_tree.setSelectionMode(QAbstractItemView.SelectionMode.NoSelection)
 
                 # Synchronize vertical scrolling
-                result_tree.verticalScrollBar().valueChanged.connect(
-                    lambda value, idx=i: self._sync_scroll(value, idx)
-                )
+                result_tree.verticalScrollBar().valueChanged.connect(lambda value, idx=i: self._sync_scroll(value, idx))
 
                 self.result_trees.append(result_tree)
                 splitter.addWidget(result_tree)
@@ -138,6 +202,8 @@ class ParallelComparisonWidget(QWidget):
         # Give splitter all remaining vertical space
         layout.addWidget(splitter, 1)
 
+        self._all_scrollbars = [tree.verticalScrollBar() for tree in self.trees + self.result_trees]
+
         # Compact button layout at bottom
         button_layout = QHBoxLayout()
         button_layout.setSpacing(5)
@@ -198,257 +264,208 @@ class ParallelComparisonWidget(QWidget):
         layout.addLayout(button_layout)
 
     def _sync_scroll(self, value: int, _source_idx: int):
-        """Synchronize scrolling across all trees."""
-        # Block signals to prevent recursive updates
-        for tree in self.trees:
-            tree.verticalScrollBar().blockSignals(True)
-        for result_tree in self.result_trees:
-            result_tree.verticalScrollBar().blockSignals(True)
-
-        # Set the scroll value directly
-        for tree in self.trees:
-            tree.verticalScrollBar().setValue(value)
-        for result_tree in self.result_trees:
-            result_tree.verticalScrollBar().setValue(value)
+        """Schedule scroll synchronization to the latest value."""
+        self._pending_scroll = value
+        if not self._scroll_timer.isActive():
+            self._scroll_timer.start()
 
-        # Unblock signals
-        for tree in self.trees:
-            tree.verticalScrollBar().blockSignals(False)
-        for result_tree in self.result_trees:
-            result_tree.verticalScrollBar().blockSignals(False)
+    def _do_sync_scroll(self):
+        """Synchronize scrolling across all trees."""
+        value = self._pending_scroll
+        for scrollbar in self._all_scrollbars:
+            # Block signals to prevent recursive updates
+            was_blocked = scrollbar.blockSignals(True)
+            scrollbar.setValue(value)
+            scrollbar.blockSignals(was_blocked)
 
     def _on_item_expanded(self, item: QTreeWidgetItem, tree_idx: int):
         """Handle item expansion - sync with other trees."""
-        # Find corresponding items in other trees
-        item_path = item.data(0, Qt.ItemDataRole.UserRole)
-        if not item_path:
-            return
-
-        for i, tree in enumerate(self.trees):
-            if i != tree_idx:
-                corresponding_item = self._find_item_by_path(tree, item_path)
-                if corresponding_item:
-                    corresponding_item.setExpanded(True)
+        self._sync_expanded(item, tree_idx, True)
 
     def _on_item_collapsed(self, item: QTreeWidgetItem, tree_idx: int):
         """Handle item collapse - sync with other trees."""
-        # Find corresponding items in other trees
+        self._sync_expanded(item, tree_idx, False)
+
+    def _sync_expanded(self, item: QTreeWidgetItem, tree_idx: int, expanded: bool):
+        """
+        Apply an item's expansion state to the corresponding items in the other trees.
+
+        Args:
+            item: Item that was expanded or collapsed
+            tree_idx: Index of the tree the item belongs to
+            expanded: New expansion state
+        """
         item_path = item.data(0, Qt.ItemDataRole.UserRole)
         if not item_path:
             return
 
-        for i, tree in enumerate(self.trees):
-            if i != tree_idx:
-                corresponding_item = self._find_item_by_path(tree, item_path)
-                if corresponding_item:
-                    corresponding_item.setExpanded(False)
-
-    def _find_item_by_path(self, tree: QTreeWidget, path: str) -> Optional[QTreeWidgetItem]:
-        """Find item in tree by path."""
-        # Recursive search
-        def search_item(item: QTreeWidgetItem) -> Optional[QTreeWidgetItem]:
-            if item.data(0, Qt.ItemDataRole.UserRole) == path:
-                return item
-            for i in range(item.childCount()):
-                result = search_item(item.child(i))
-                if result:
-                    return result
-            return None
-
-        # Search in all top-level items
-        for i in range(tree.topLevelItemCount()):
-            top_item = tree.topLevelItem(i)
-            if top_item is not None:
-                result = search_item(top_item)
-                if result:
-                    return result
-
-        return None
+        # items_map already indexes every item by path, so no tree search is needed
+        for key, corresponding_item in self.items_map.get(item_path, {}).items():
+            if key != tree_idx:
+                corresponding_item.setExpanded(expanded)
 
     def _expand_all(self):
         """Expand all items in all trees."""
-        for tree in self.trees:
+        for tree in self.trees + self.result_trees:
+            # Repaint once after the whole tree is expanded
+            tree.setUpdatesEnabled(False)
             tree.expandAll()
-        for result_tree in self.result_trees:
-            result_tree.expandAll()
+            tree.setUpdatesEnabled(True)
 
     def _collapse_all(self):
         """Collapse all items in all trees."""
-        for tree in self.trees:
+        for tree in self.trees + self.result_trees:
+            tree.setUpdatesEnabled(False)
             tree.collapseAll()
-        for result_tree in self.result_trees:
-            result_tree.collapseAll()
+            tree.setUpdatesEnabled(True)
 
     def _scan_directories(self):
-        """Scan directories and populate trees (without comparison)."""
+        """Start scanning directories in a worker thread (without comparison)."""
         self.progress_label.setText(tr("preparing"))
         self.progress_bar.setMaximum(0)  # Indeterminate
+        self.compare_all_btn.setEnabled(False)
 
-        # Collect all files from all directories
-        all_files = {}  # rel_path -> [Path | None, Path | None, ...]
-
-        for dir_idx, directory in enumerate(self.paths):
-            for root, _dirs, files in directory.walk():
-                rel_root = root.relative_to(directory)
+        self.worker = DirectoryScanWorker(self.paths)
+        self.worker.scan_finished.connect(self._on_scan_finished)
+        self.worker.start()
 
-                # Add directories
-                if str(rel_root) != ".":
-                    if str(rel_root) not in all_files:
-                        all_files[str(rel_root)] = [None] * len(self.paths)
-                    all_files[str(rel_root)][dir_idx] = root
-
-                # Add files
-                for file in files:
-                    file_path = root / file
-                    rel_path = file_path.relative_to(directory)
-                    rel_path_str = str(rel_path)
-
-                    if rel_path_str not in all_files:
-                        all_files[rel_path_str] = [None] * len(self.paths)
+    def _on_scan_finished(self, all_files: Dict[str, List[Optional[ScanEntry]]]):
+        """
+        Populate trees from the scan result.
 
-                    all_files[rel_path_str][dir_idx] = file_path
+        Args:
+            all_files: Mapping of relative path to scan entries per directory
+        """
+        self._scan_entries = all_files
+        # Read once for the whole population rather than per item
+        self._exists_color = COLOR_EXISTS_DARK if self.settings.get_dark_mode() else COLOR_EXISTS_LIGHT
+        all_trees = self.trees + self.result_trees
+
+        # Populate trees without repainting after every item
+        for tree in all_trees:
+            tree.setUpdatesEnabled(False)
+
+        # Create detached items, grouped by parent path (None for top-level items)
+        children: Dict[Optional[str], List[Dict[str | int, QTreeWidgetItem]]] = {}
+        for rel_path, entries in sorted(all_files.items()):
+            parent_path = self._add_item_to_trees(rel_path, entries)
+            children.setdefault(parent_path, []).append(self.items_map[rel_path])
+
+        # Attach each parent's children in one call; top-level items go last so subtrees are complete when shown
+        trees_by_key: Dict[str | int, QTreeWidget] = dict(enumerate(self.trees))
+        trees_by_key.update((f"result_{i}", tree) for i, tree in enumerate(self.result_trees))
+        top_level = children.pop(None, [])
+        for parent_path, rows in children.items():
+            parent_items = self.items_map[parent_path]
+            for key in trees_by_key:
+                parent_items[key].addChildren([row[key] for row in rows])
+        for key, tree in trees_by_key.items():
+            tree.addTopLevelItems([row[key] for row in top_level])
 
-        # Populate trees
-        for rel_path in sorted(all_files.keys()):
-            paths = all_files[rel_path]
-            self._add_item_to_trees(rel_path, paths)
+        # Expand first level
+        for tree in all_trees:
+            tree.expandToDepth(0)
+            tree.setUpdatesEnabled(True)
 
         self.progress_bar.setMaximum(100)
         self.progress_bar.setValue(100)
         self.progress_label.setText(tr("complete"))
+        self.compare_all_btn.setEnabled(True)
 
-        # Expand first level
-        for tree in self.trees:
-            tree.expandToDepth(0)
-        for result_tree in self.result_trees:
-            result_tree.expandToDepth(0)
+    def _add_item_to_trees(self, rel_path_str: str, entries: List[Optional[ScanEntry]]) -> Optional[str]:
+        """
+        Create the items of a path for all trees and register them in items_map.
 
-    def _add_item_to_trees(self, rel_path_str: str, paths: List[Optional[Path]]):
-        """Add an item to all trees."""
-        path_obj = Path(rel_path_str)
-        parts = list(path_obj.parts)
+        The items are created detached; the caller attaches them to their parents in bulk.
 
-        if not parts:
-            return
+        Args:
+            rel_path_str: Relative path of the item
+            entries: Scan entry per directory (None where the path does not exist)
 
-        # Create or get parent items
-        parent_items = [None] * len(self.trees)
-        parent_result_items = [None] * len(self.result_trees)
+        Returns:
+            Relative path of the parent item, or None for a top-level item
+        """
+        # Scanned relative paths always use os.sep, so they are split as strings without building Path objects
+        parent_path, _, name = rel_path_str.rpartition(os.sep)
+
+        if not name:
+            return None
 
-        if len(parts) > 1:
-            parent_path = str(Path(*parts[:-1]))
-            if parent_path in self.items_map:
-                parent_items = [self.items_map[parent_path].get(i) for i in range(len(self.trees))]
-                parent_result_items = [self.items_map[parent_path].get(f"result_{i}") for i in range(len(self.result_trees))]
+        # Find the parent item
+        if parent_path not in self.items_map:
+            parent_path = None
 
         # Determine if this is a directory
-        is_dir = any(p and p.is_dir() for p in paths if p)
+        is_dir = any(entry is not None and entry[2] for entry in entries)
+
+        # Name label with icon; the extension is the same in every tree, so it is built once per path
+        if is_dir:
+            label = f"📁 {name}"
+        else:
+            file_type = self._detect_file_type(rel_path_str)
+            icon = "📄"
+            if file_type == FileType.IMAGE:
+                icon = "🖼️"
+            elif file_type == FileType.BINARY:
+                icon = "📦"
+            label = f"{icon} {name}"
+        missing_label = f"× {name}"  # Shown for non-existent files
 
         # Create items in each tree
         tree_items: Dict[str | int, QTreeWidgetItem] = {}
-        for i, tree in enumerate(self.trees):
-            parent_item = parent_items[i]
-            if parent_item is not None:
-                item = QTreeWidgetItem(parent_item)
-            else:
-                item = QTreeWidgetItem(tree)
+        for i in range(len(self.trees)):
+            entry = entries[i]
+            size_str = ""
+            mtime_str = ""
+
+            # Add file size and modified time from the stat cached during the scan (none for directories)
+            stat = entry[1] if entry is not None and not is_dir else None
+            if stat is not None:
+                size_str = _format_size(stat.st_size)
+                mtime_str = time.strftime(MTIME_FORMAT, time.localtime(stat.st_mtime))
+
+            # All columns are set at construction, before the item is attached to a tree
+            item = QTreeWidgetItem([label if entry is not None else missing_label, size_str, mtime_str])
+            if size_str:
+                item.setTextAlignment(1, SIZE_ALIGNMENT)
 
-            # Set text and icon
-            name = parts[-1]
             if is_dir:
-                item.setText(0, f"📁 {name}")
-                item.setText(1, "")  # No size for directories
-                item.setText(2, "")  # No modified time for directories
-                font = item.font(0)
-                font.setBold(True)
-                item.setFont(0, font)
-                item.setForeground(0, QColor("#6495ED"))
-            else:
-                # Detect file type
-                file_type = FileType.BINARY
-                path_i = paths[i]
-                if path_i is not None:
-                    file_type = self.detector.detect(path_i)
-
-                icon = "📄"
-                if file_type == FileType.IMAGE:
-                    icon = "🖼️"
-                elif file_type == FileType.BINARY:
-                    icon = "📦"
-
-                item.setText(0, f"{icon} {name}")
-
-                # Add file size and modified time
-                if path_i is not None and path_i.exists():
-                    try:
-                        stat = path_i.stat()
-                        # Format file size
-                        size = stat.st_size
-                        if size < 1024:
-                            size_str = f"{size} B"
-                        elif size < 1024 * 1024:
-                            size_str = f"{size / 1024:.1f} KB"
-                        elif size < 1024 * 1024 * 1024:
-                            size_str = f"{size / (1024 * 1024):.1f} MB"
-                        else:
-                            size_str = f"{size / (1024 * 1024 * 1024):.2f} GB"
-
-                        item.setText(1, size_str)
-                        item.setTextAlignment(1, Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
-
-                        # Format modified time
-                        from datetime import datetime
-                        mtime = datetime.fromtimestamp(stat.st_mtime)
-                        item.setText(2, mtime.strftime("%Y/%m/%d %H:%M:%S"))
-                    except Exception:
-                        item.setText(1, "")
-                        item.setText(2, "")
-                else:
-                    item.setText(1, "")
-                    item.setText(2, "")
+                item.setFont(0, self._directory_font)
+                item.setForeground(0, COLOR_DIRECTORY)
 
             # Mark if file exists in this location
-            if paths[i]:
-                item.setForeground(0, QColor("#FFFFFF") if self.settings.get_dark_mode() else QColor("#000000"))
+            if entry is not None:
+                item.setForeground(0, self._exists_color)
             else:
-                item.setForeground(0, QColor("#888888"))
-                item.setFont(0, QFont("", -1, QFont.Weight.Light, True))  # Italic
-                item.setText(0, f"× {name}")  # Show × for non-existent files
+                item.setForeground(0, COLOR_MISSING)
+                item.setFont(0, self._missing_font)
 
-            # Store path data
+            # Store the relative path only; full paths and stats stay in the scan entries
             item.setData(0, Qt.ItemDataRole.UserRole, rel_path_str)
-            item.setData(0, Qt.ItemDataRole.UserRole + 1, paths[i])
 
             tree_items[i] = item
 
         # Create result items
-        for i, result_tree in enumerate(self.result_trees):
-            parent_result_item = parent_result_items[i]
-            if parent_result_item is not None:
-                result_item = QTreeWidgetItem(parent_result_item)
-            else:
-                result_item = QTreeWidgetItem(result_tree)
+        for i in range(len(self.result_trees)):
+            result_item = QTreeWidgetItem()
 
             # Show comparison status based on file existence
-            left_path = paths[i]
-            right_path = paths[i + 1] if i + 1 < len(paths) else None
+            left_path = entries[i]
+            right_path = entries[i + 1] if i + 1 < len(entries) else None
 
             if left_path is None and right_path is None:
                 # Both don't exist
                 result_item.setText(0, "")
-                result_item.setForeground(0, QColor("#888888"))
+                result_item.setForeground(0, COLOR_MISSING)
             elif left_path is None or right_path is None:
                 # One side doesn't exist
                 result_item.setText(0, "≠")
-                result_item.setForeground(0, QColor("#F44336"))  # Red
-                font = result_item.font(0)
-                font.setBold(True)
-                font.setPointSize(14)
-                result_item.setFont(0, font)
+                result_item.setForeground(0, COLOR_DIFFERENT)
+                result_item.setFont(0, self._result_font)
             else:
                 # Both exist - show as not compared yet
                 result_item.setText(0, "")
-                result_item.setForeground(0, QColor("#888888"))
+                result_item.setForeground(0, COLOR_MISSING)
 
             result_item.setTextAlignment(0, Qt.AlignmentFlag.AlignCenter)
 
@@ -456,42 +473,91 @@ class ParallelComparisonWidget(QWidget):
 
         # Store items
         self.items_map[rel_path_str] = tree_items
+        return parent_path
+
+    def _scan_entry(self, rel_path: str, tree_idx: int) -> Optional[ScanEntry]:
+        """
+        Get the scan entry of a path in one directory.
+
+        Args:
+            rel_path: Relative path of the item
+            tree_idx: Index of the directory
+
+        Returns:
+            Scan entry, or None if the path does not exist in that directory
+        """
+        entries = self._scan_entries.get(rel_path)
+        return entries[tree_idx] if entries else None
+
+    def _file_path(self, rel_path: str, tree_idx: int) -> Optional[str]:
+        """
+        Get the full path of a file in one directory.
+
+        Args:
+            rel_path: Relative path of the item
+            tree_idx: Index of the directory
+
+        Returns:
+            Full path, or None if the path is missing or a directory there
+        """
+        entry = self._scan_entry(rel_path, tree_idx)
+        if entry is None or entry[2]:
+            return None
+        return entry[0]
+
+    def _detect_file_type(self, path: str) -> FileType:
+        """
+        Detect a file type, caching the result per extension.
+
+        Args:
+            path: File path (only its extension is used)
+
+        Returns:
+            FileType enum value
+        """
+        ext = os.path.splitext(path)[1].lower()
+        file_type = self._file_types.get(ext)
+        if file_type is None:
+            file_type = self._file_types[ext] = self.detector.detect(path)
+        return file_type
 
     def _compare_selected(self):
         """Compare selected items."""
         # Get selected items from any tree
         paths_to_compare: Set[str] = set()
 
-        for tree in self.trees:
+        for tree_idx, tree in enumerate(self.trees):
             selected_items = tree.selectedItems()
             for item in selected_items:
                 rel_path = item.data(0, Qt.ItemDataRole.UserRole)
                 if rel_path:
                     # If it's a directory, add all files recursively
-                    full_path = item.data(0, Qt.ItemDataRole.UserRole + 1)
-                    if full_path and full_path.is_dir():
+                    entry = self._scan_entry(rel_path, tree_idx)
+                    if entry is not None and entry[2]:
                         # Recursively add all files in directory
-                        self._add_directory_files(item, paths_to_compare)
+                        self._add_directory_files(rel_path, tree_idx, paths_to_compare)
                     else:
                         paths_to_compare.add(rel_path)
 
         if paths_to_compare:
             self._start_comparison(list(paths_to_compare))
 
-    def _add_directory_files(self, dir_item: QTreeWidgetItem, paths_set: Set[str]):
-        """Recursively add all files in directory to paths set."""
-        # Add current item if it's a file
-        rel_path = dir_item.data(0, Qt.ItemDataRole.UserRole)
-        full_path = dir_item.data(0, Qt.ItemDataRole.UserRole + 1)
-
-        if rel_path and full_path and not full_path.is_dir():
-            paths_set.add(rel_path)
+    def _add_directory_files(self, dir_path: str, tree_idx: int, paths_set: Set[str]):
+        """
+        Add all files below a directory to paths set.
 
-        # Process children
-        for i in range(dir_item.childCount()):
-            child = dir_item.child(i)
-            if child:
-                self._add_directory_files(child, paths_set)
+        Args:
+            dir_path: Relative path of the directory
+            tree_idx: Index of the directory tree the selection was made in
+            paths_set: Set receiving the relative paths of the files
+        """
+        # Every scanned path is a key of the scan entries, so a prefix match finds all descendants without walking the tree
+        prefix = dir_path + os.sep
+        paths_set.update(
+            rel_path
+            for rel_path, entries in self._scan_entries.items()
+            if rel_path.startswith(prefix) and entries[tree_idx] is not None and not entries[tree_idx][2]
+        )
 
     def _compare_all(self):
         """Compare all items."""
@@ -499,109 +565,122 @@ class ParallelComparisonWidget(QWidget):
         self._start_comparison(paths_to_compare)
 
     def _start_comparison(self, paths_to_compare: List[str]):
-        """Start comparison for specified paths."""
+        """Start comparison for specified paths in a worker thread."""
         if not paths_to_compare:
             return
 
-        self.pending_comparisons = set(paths_to_compare)
+        # Only one scan or comparison runs at a time
+        if self.worker is not None and self.worker.isRunning():
+            return
+
+        # Unless strict comparison is enabled, equal size and modification time from the scan count as identical
+        trust_mtime = not self.settings.get_strict_comparison()
+
+        # Collect the files to compare; directories and missing files are left out
+        items: List[FileComparisonItem] = []
+        for rel_path in paths_to_compare:
+            if rel_path not in self.items_map:
+                continue
+
+            # Get file paths from each tree
+            file_paths = [self._file_path(rel_path, i) for i in range(len(self.trees))]
+
+            # Skip if no consecutive pair exists on both sides
+            if not any(file_paths[i] is not None and file_paths[i + 1] is not None for i in range(len(file_paths) - 1)):
+                continue
+
+            # Sizes and times come from the stat cached during the scan
+            stats = [entry[1] if entry is not None else None for entry in self._scan_entries.get(rel_path, [])]
+            stats += [None] * (len(file_paths) - len(stats))
+            sizes = [stat.st_size if stat is not None and path is not None else None for stat, path in zip(stats, file_paths)]
+            mtimes = None
+            if trust_mtime:
+                mtimes = [stat.st_mtime_ns if stat is not None and path is not None else None for stat, path in zip(stats, file_paths)]
+
+            file_type = self._detect_file_type(rel_path)
+            items.append(FileComparisonItem(rel_path, file_paths, file_type, sizes, mtimes))
+
+        if not items:
+            return
+
+        self.pending_comparisons = {item.name for item in items}
 
         # Show progress widgets
         self.progress_label.setVisible(True)
         self.progress_bar.setVisible(True)
         self.stop_btn.setVisible(True)
         self.stop_btn.setEnabled(True)
+        self.compare_all_btn.setEnabled(False)
 
         # Set progress
-        self.progress_bar.setMaximum(len(paths_to_compare))
+        self.progress_bar.setMaximum(len(items))
         self.progress_bar.setValue(0)
-        self.progress_label.setText(tr("comparing", f"0/{len(paths_to_compare)}"))
-
-        # Compare files
-        from ..utils.comparator import TextComparator, ImageComparator, BinaryComparator
-
-        text_threshold = self.settings.get_text_similarity_threshold()
-        image_threshold = self.settings.get_image_similarity_threshold()
-        binary_threshold = self.settings.get_binary_similarity_threshold()
-
-        compared_count = 0
-        for rel_path in paths_to_compare:
-            if rel_path not in self.items_map:
-                continue
-
-            items = self.items_map[rel_path]
-
-            # Get file paths from each tree
-            file_paths = []
-            for i in range(len(self.trees)):
-                item = items.get(i)
-                if item:
-                    path = item.data(0, Qt.ItemDataRole.UserRole + 1)
-                    file_paths.append(path)
-                else:
-                    file_paths.append(None)
-
-            # Compare consecutive pairs
-            for i in range(len(file_paths) - 1):
-                path1 = file_paths[i]
-                path2 = file_paths[i + 1]
-                result_item = items.get(f"result_{i}")
-
-                if not result_item:
-                    continue
+        self.progress_label.setText(tr("comparing", 0, len(items)))
+
+        self.worker = ItemComparisonWorker(
+            items,
+            self.settings.get_text_similarity_threshold(),
+            self.settings.get_image_similarity_threshold(),
+            self.settings.get_binary_similarity_threshold(),
+            self.settings.get_comparison_workers() or None,
+        )
+        self.worker.progress.connect(self._on_progress)
+        self.worker.comparison_complete.connect(self._on_comparison_complete)
+        self.worker.finished.connect(self._on_comparison_finished)
+        self.worker.start()
+
+    def _on_progress(self, current: int, total: int, _code: int, _arg: str):
+        """Handle progress update."""
+        self.progress_bar.setMaximum(total)
+        self.progress_bar.setValue(current)
+        self.progress_label.setText(tr("comparing", current, total))
+
+    def _on_comparison_complete(self, item: FileComparisonItem, _results: List[Optional[ComparisonResult]]):
+        """Buffer a compared item until the next result flush."""
+        self.pending_comparisons.discard(item.name)
+        self._pending_results.append(item)
+        if not self._result_timer.isActive():
+            self._result_timer.start()
+
+    def _flush_results(self):
+        """Show all buffered results with a single repaint per result tree."""
+        items, self._pending_results = self._pending_results, []
+        if not items:
+            return
 
-                # Skip if either path doesn't exist or is a directory
-                if not path1 or not path2:
-                    continue
+        for result_tree in self.result_trees:
+            result_tree.setUpdatesEnabled(False)
 
-                if not path1.exists() or not path2.exists():
-                    continue
+        for item in items:
+            tree_items = self.items_map[item.name]
 
-                if path1.is_dir() or path2.is_dir():
+            for i, result in enumerate(item.results):
+                result_item = tree_items.get(f"result_{i}")
+                if result is None or result_item is None:
                     continue
 
-                # Detect file type
-                file_type = self.detector.detect(path1)
+                # Update result display with symbols and colors
+                symbol, color, tooltip_key = RESULT_STYLES.get(result.status, RESULT_STYLES[ComparisonResult.DIFFERENT])
+                result_item.setFont(0, self._result_font)
+                result_item.setText(0, symbol)
+                result_item.setForeground(0, color)
+                if tooltip_key is not None:
+                    result_item.setToolTip(0, tr(tooltip_key, f"{result.similarity:.1f}"))
 
-                # Compare files
-                if file_type == FileType.TEXT:
-                    result = TextComparator.compare(path1, path2, text_threshold)
-                elif file_type == FileType.IMAGE:
-                    result = ImageComparator.compare(path1, path2, image_threshold)
-                else:
-                    result = BinaryComparator.compare(path1, path2, binary_threshold)
+        for result_tree in self.result_trees:
+            result_tree.setUpdatesEnabled(True)
 
-                # Update result display with symbols and colors
-                font = result_item.font(0)
-                font.setBold(True)
-                font.setPointSize(14)
-                result_item.setFont(0, font)
-
-                if result.status == ComparisonResult.IDENTICAL:
-                    result_item.setText(0, "=")
-                    result_item.setForeground(0, QColor("#4CAF50"))  # Green
-                elif result.status == ComparisonResult.SIMILAR_EXIF:
-                    result_item.setText(0, "≒")
-                    result_item.setForeground(0, QColor("#2196F3"))  # Blue
-                    result_item.setToolTip(0, "EXIF差異のみ")
-                elif result.status == ComparisonResult.SIMILAR:
-                    result_item.setText(0, "≒")
-                    result_item.setForeground(0, QColor("#FFA500"))  # Orange
-                    result_item.setToolTip(0, f"類似度: {result.similarity:.1f}%")
-                else:
-                    result_item.setText(0, "≠")
-                    result_item.setForeground(0, QColor("#F44336"))  # Red
-                    result_item.setToolTip(0, f"相違: {result.similarity:.1f}%")
-
-            # Update progress
-            compared_count += 1
-            self.progress_bar.setValue(compared_count)
-            self.progress_label.setText(tr("comparing", f"{compared_count}/{len(paths_to_compare)}"))
+    def _on_comparison_finished(self):
+        """Handle comparison worker finished."""
+        self._result_timer.stop()
+        self._flush_results()
 
         # Hide progress widgets when complete
         self.progress_label.setVisible(False)
         self.progress_bar.setVisible(False)
         self.stop_btn.setVisible(False)
         self.stop_btn.setEnabled(False)
+        self.compare_all_btn.setEnabled(True)
 
     def _stop_comparison(self):
         """Stop comparison."""
@@ -620,50 +699,34 @@ class ParallelComparisonWidget(QWidget):
 
     def _open_in_external_tool(self):
         """Open selected files in external tool."""
-        # Get file paths from all trees
-        file_paths: List[Path] = []
-
+        # Use the first selected item; its path identifies the same row in every tree
+        rel_path = None
         for tree in self.trees:
             selected_items = tree.selectedItems()
             if selected_items:
-                item = selected_items[0]  # Use first selected item
-                full_path = item.data(0, Qt.ItemDataRole.UserRole + 1)
-                if full_path and full_path.exists() and not full_path.is_dir():
-                    file_paths.append(full_path)
-                    break  # Only get one path per tree
+                rel_path = selected_items[0].data(0, Qt.ItemDataRole.UserRole)
+                break
 
-        if not file_paths:
+        if not rel_path or rel_path not in self.items_map:
             return
 
-        # Get external tool settings
-        text_tool = self.settings.get_external_text_tool()
-        image_tool = self.settings.get_external_image_tool()
-        binary_tool = self.settings.get_external_binary_tool()
+        # Get file paths from all trees, keeping the positions of missing files
+        file_paths = [self._file_path(rel_path, i) for i in range(len(self.trees))]
 
-        # Detect file type
-        file_type = self.detector.detect(file_paths[0])
+        if not any(file_paths):
+            return
 
-        # Select appropriate tool
-        tool = ""
-        if file_type == FileType.TEXT and text_tool:
-            tool = text_tool
-        elif file_type == FileType.IMAGE and image_tool:
-            tool = image_tool
-        elif binary_tool:
-            tool = binary_tool
+        # Get external tool config
+        file_type = self._detect_file_type(rel_path)
+        config = self.settings.get_external_tool_config(file_type.value)
+        executable = config.get("executable", "").strip()
 
-        if not tool:
+        if not executable:
             return
 
-        # Build command and execute
+        # Execute
         try:
-            # Replace placeholders
-            cmd = tool
-            for i, path in enumerate(file_paths):
-                cmd = cmd.replace(f"${i+1}", str(path))
-
-            # Execute command
-            subprocess.Popen(cmd, shell=True)
+            launch(executable, build_tool_args(config, file_paths))
         except Exception as e:
             print(f"Failed to open external tool: {e}")
 
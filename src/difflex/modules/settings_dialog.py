@@ -1,14 +1,108 @@
 """Settings dialog."""
 
+from functools import lru_cache, partial
+from typing import Callable
 from PySide6.QtWidgets import (
-    QDialog, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
-    QTextEdit, QCheckBox, QSpinBox, QGroupBox, QLineEdit,
-    QFileDialog, QTabWidget, QWidget, QFormLayout, QComboBox
+    QDialog,
+    QVBoxLayout,
+    QHBoxLayout,
+    QLabel,
+    QPushButton,
+    QPlainTextEdit,
+    QCheckBox,
+    QSpinBox,
+    QGroupBox,
+    QLineEdit,
+    QFileDialog,
+    QTabWidget,
+    QWidget,
+    QFormLayout,
+    QComboBox,
 )
 from PySide6.QtCore import Signal
 
-from ..utils.settings import Settings
-from ..utils.i18n import tr
+from ..utils.settings import DEFAULT_EXTERNAL_TOOL_CONFIG, EXTERNAL_TOOL_TYPES, Settings
+from ..utils.file_types import normalize_extensions
+from ..utils.i18n import get_translator, tr
+
+# Language combo entries: (name key, language code; empty for automatic detection)
+LANGUAGE_CHOICES = (("language_ja", "ja-JP"), ("language_en", "en-US"), ("language_auto", ""))
+
+# Translation keys used by every ExternalToolWidget
+TOOL_TEXT_KEYS = (
+    "browse",
+    "executable",
+    "arg_before",
+    "arg_before_example",
+    "arg_file1",
+    "arg_file2",
+    "arg_file3",
+    "arg_after",
+    "arg_after_example",
+    "pack_args",
+    "pack_args_tooltip",
+)
+
+# Argument rows of ExternalToolWidget: (config key, label key, placeholder key or None to show the default, default)
+TOOL_ARG_FIELDS = (
+    ("arg_before", "arg_before", "arg_before_example", ""),
+    ("arg1", "arg_file1", None, "%s"),
+    ("arg2", "arg_file2", None, "%s"),
+    ("arg3", "arg_file3", None, "%s"),
+    ("arg_after", "arg_after", "arg_after_example", ""),
+)
+
+# Value used for each text field of ExternalToolWidget when it is missing or left empty
+TOOL_FIELD_DEFAULTS = {"executable": "", **{key: default for key, _, _, default in TOOL_ARG_FIELDS}}
+
+
+@lru_cache(maxsize=1)
+def _tool_texts(language: str) -> dict[str, str]:
+    """
+    Translate the external tool widget texts, once per language.
+
+    Args:
+        language: Current language code (part of the cache key)
+
+    Returns:
+        Dictionary of translation key to translated text
+    """
+    return {key: tr(key) for key in TOOL_TEXT_KEYS}
+
+
+@lru_cache(maxsize=1)
+def _tool_arg_rows(language: str) -> tuple[tuple[str, str, str], ...]:
+    """
+    Resolve the external tool argument rows, once per language.
+
+    Args:
+        language: Current language code (part of the cache key)
+
+    Returns:
+        Tuple of (config key, label, placeholder text) per row
+    """
+    texts = _tool_texts(language)
+    return tuple(
+        (key, texts[label_key], texts[placeholder_key] if placeholder_key else default) for key, label_key, placeholder_key, default in TOOL_ARG_FIELDS
+    )
+
+
+def _form_layout(parent: QWidget) -> QFormLayout:
+    """
+    Create a form layout with fixed row policies.
+
+    Setting the policies up front keeps the layout from re-deriving them from the style as rows are added.
+
+    Args:
+        parent: Widget the layout is installed on
+
+    Returns:
+        Created layout
+    """
+    layout = QFormLayout(parent)
+    layout.setRowWrapPolicy(QFormLayout.RowWrapPolicy.DontWrapRows)
+    layout.setFieldGrowthPolicy(QFormLayout.FieldGrowthPolicy.AllNonFixedFieldsGrow)
+    return layout
 
 
 class ExternalToolWidget(QWidget):
@@ -28,75 +122,52 @@ class ExternalToolWidget(QWidget):
 
     def _setup_ui(self):
         """Setup user interface."""
-        layout = QFormLayout(self)
+        layout = _form_layout(self)
+        # The dialog builds three of these back to back with the same texts
+        language = get_translator().current_language
+        texts = _tool_texts(language)
 
         # Executable
         exec_layout = QHBoxLayout()
         self.executable_edit = QLineEdit()
         exec_layout.addWidget(self.executable_edit, 1)
-        browse_btn = QPushButton(tr("browse"))
+        browse_btn = QPushButton(texts["browse"])
         browse_btn.clicked.connect(self._browse_executable)
         exec_layout.addWidget(browse_btn)
-        layout.addRow(tr("executable"), exec_layout)
+        layout.addRow(texts["executable"], exec_layout)
 
         # Arguments
-        self.arg_before_edit = QLineEdit()
-        self.arg_before_edit.setPlaceholderText(tr("arg_before_example"))
-        layout.addRow(tr("arg_before"), self.arg_before_edit)
-
-        self.arg1_edit = QLineEdit()
-        self.arg1_edit.setPlaceholderText("%s")
-        layout.addRow(tr("arg_file1"), self.arg1_edit)
-
-        self.arg2_edit = QLineEdit()
-        self.arg2_edit.setPlaceholderText("%s")
-        layout.addRow(tr("arg_file2"), self.arg2_edit)
-
-        self.arg3_edit = QLineEdit()
-        self.arg3_edit.setPlaceholderText("%s")
-        layout.addRow(tr("arg_file3"), self.arg3_edit)
-
-        self.arg_after_edit = QLineEdit()
-        self.arg_after_edit.setPlaceholderText(tr("arg_after_example"))
-        layout.addRow(tr("arg_after"), self.arg_after_edit)
+        self._edits = {"executable": self.executable_edit}
+        for key, label, placeholder in _tool_arg_rows(language):
+            edit = QLineEdit()
+            edit.setPlaceholderText(placeholder)
+            layout.addRow(label, edit)
+            self._edits[key] = edit
 
         # Pack args option
-        self.pack_args_check = QCheckBox(tr("pack_args"))
-        self.pack_args_check.setToolTip(tr("pack_args_tooltip"))
+        self.pack_args_check = QCheckBox(texts["pack_args"])
+        self.pack_args_check.setToolTip(texts["pack_args_tooltip"])
         layout.addRow("", self.pack_args_check)
 
     def _browse_executable(self):
         """Browse for executable."""
-        path, _ = QFileDialog.getOpenFileName(
-            self,
-            tr("select_executable"),
-            "",
-            tr("executable_files")
-        )
+        path, _ = QFileDialog.getOpenFileName(self, tr("select_executable"), "", tr("executable_files"))
         if path:
             self.executable_edit.setText(path)
 
     def load_config(self, config: dict):
         """Load configuration."""
-        self.executable_edit.setText(config.get("executable", ""))
-        self.arg_before_edit.setText(config.get("arg_before", ""))
-        self.arg1_edit.setText(config.get("arg1", "%s"))
-        self.arg2_edit.setText(config.get("arg2", "%s"))
-        self.arg3_edit.setText(config.get("arg3", "%s"))
-        self.arg_after_edit.setText(config.get("arg_after", ""))
-        self.pack_args_check.setChecked(config.get("pack_args", False))
+        config = {**DEFAULT_EXTERNAL_TOOL_CONFIG, **config}
+        for key, edit in self._edits.items():
+            if edit.text() != config[key]:
+                edit.setText(config[key])
+        self.pack_args_check.setChecked(config["pack_args"])
 
     def get_config(self) -> dict:
         """Get configuration."""
-        return {
-            "executable": self.executable_edit.text().strip(),
-            "arg_before": self.arg_before_edit.text().strip(),
-            "arg1": self.arg1_edit.text().strip() or "%s",
-            "arg2": self.arg2_edit.text().strip() or "%s",
-            "arg3": self.arg3_edit.text().strip() or "%s",
-            "arg_after": self.arg_after_edit.text().strip(),
-            "pack_args": self.pack_args_check.isChecked()
-        }
+        config = {key: edit.text().strip() or TOOL_FIELD_DEFAULTS[key] for key, edit in self._edits.items()}
+        config["pack_args"] = self.pack_args_check.isChecked()
+        return config
 
 
 class SettingsDialog(QDialog):
@@ -104,15 +175,39 @@ class SettingsDialog(QDialog):
 
     language_changed = Signal()  # Signal emitted when language changes
 
-    def __init__(self, parent=None):
-        """Initialize settings dialog."""
+    def __init__(self, parent=None, settings: Settings | None = None):
+        """
+        Initialize settings dialog.
+
+        Args:
+            parent: Parent widget
+            settings: Shared settings object (a new one is created if omitted)
+        """
         super().__init__(parent)
         self.setWindowTitle(tr("settings_title"))
         self.setMinimumSize(600, 500)
-        self.settings = Settings()
+        self.settings = settings if settings is not None else Settings()
+        # Settings as last loaded; tabs built later load from this snapshot too
+        self._values: dict = {}
+        self._language_index: dict[str, int] = {}
+        # The similarity and external tool tabs are built into their placeholder page the first time they are shown
+        self._pending_pages: dict[QWidget, Callable[[QWidget], None]] = {}
+        # Similarity tab widgets; None until that tab is built
+        self.text_threshold_spin: QSpinBox | None = None
+        self.image_threshold_spin: QSpinBox | None = None
+        self.binary_threshold_spin: QSpinBox | None = None
+        self.strict_comparison_check: QCheckBox | None = None
+        self.comparison_workers_spin: QSpinBox | None = None
+        # External tool widgets built so far, by file type
+        self._tool_widgets: dict[str, ExternalToolWidget] = {}
         self._setup_ui()
         self._load_settings()
 
+    @property
+    def _similarity_built(self) -> bool:
+        """Whether the similarity tab has been built."""
+        return self.text_threshold_spin is not None
+
     def _setup_ui(self):
         """Setup user interface."""
         layout = QVBoxLayout(self)
@@ -128,9 +223,9 @@ class SettingsDialog(QDialog):
         lang_layout = QHBoxLayout()
         lang_layout.addWidget(QLabel(tr("language_label")))
         self.language_combo = QComboBox()
-        self.language_combo.addItem(tr("language_ja"), "ja-JP")
-        self.language_combo.addItem(tr("language_en"), "en-US")
-        self.language_combo.addItem(tr("language_auto"), "")
+        for name_key, language in LANGUAGE_CHOICES:
+            self._language_index[language] = self.language_combo.count()
+            self.language_combo.addItem(tr(name_key), language)
         lang_layout.addWidget(self.language_combo)
         lang_layout.addStretch()
         general_layout.addLayout(lang_layout)
@@ -142,8 +237,9 @@ class SettingsDialog(QDialog):
         # Text extensions
         ext_group = QGroupBox(tr("text_extensions"))
         ext_layout = QVBoxLayout(ext_group)
-        ext_layout.addWidget(QLabel(tr("extension_help")))
-        self.text_ext_edit = QTextEdit()
+        extension_help = tr("extension_help")
+        ext_layout.addWidget(QLabel(extension_help))
+        self.text_ext_edit = QPlainTextEdit()
         self.text_ext_edit.setMaximumHeight(100)
         ext_layout.addWidget(self.text_ext_edit)
         general_layout.addWidget(ext_group)
@@ -151,8 +247,8 @@ class SettingsDialog(QDialog):
         # Image extensions
         img_group = QGroupBox(tr("image_extensions"))
         img_layout = QVBoxLayout(img_group)
-        img_layout.addWidget(QLabel(tr("extension_help")))
-        self.image_ext_edit = QTextEdit()
+        img_layout.addWidget(QLabel(extension_help))
+        self.image_ext_edit = QPlainTextEdit()
         self.image_ext_edit.setMaximumHeight(100)
         img_layout.addWidget(self.image_ext_edit)
         general_layout.addWidget(img_group)
@@ -160,9 +256,58 @@ class SettingsDialog(QDialog):
         general_layout.addStretch()
         tabs.addTab(general_tab, tr("general"))
 
-        # Similarity tab
-        similarity_tab = QWidget()
-        similarity_layout = QFormLayout(similarity_tab)
+        self._add_lazy_tab(tabs, tr("similarity"), self._build_similarity_tab)
+        self._add_lazy_tab(tabs, tr("external_tools"), self._build_tools_tab)
+        tabs.currentChanged.connect(partial(self._ensure_page_built, tabs))
+
+        layout.addWidget(tabs)
+
+        # Buttons
+        button_layout = QHBoxLayout()
+        button_layout.addStretch()
+
+        ok_btn = QPushButton(tr("ok"))
+        ok_btn.clicked.connect(self._save_and_close)
+        button_layout.addWidget(ok_btn)
+
+        cancel_btn = QPushButton(tr("cancel"))
+        cancel_btn.clicked.connect(self.reject)
+        button_layout.addWidget(cancel_btn)
+
+        layout.addLayout(button_layout)
+
+    def _add_lazy_tab(self, tabs: QTabWidget, title: str, builder: Callable[[QWidget], None]):
+        """
+        Add a placeholder tab whose contents are built on first display.
+
+        Args:
+            tabs: Tab widget to add the page to
+            title: Tab title
+            builder: Callable that fills the placeholder page
+        """
+        page = QWidget()
+        self._pending_pages[page] = builder
+        tabs.addTab(page, title)
+
+    def _ensure_page_built(self, tabs: QTabWidget, index: int):
+        """
+        Build the contents of a tab the first time it is shown.
+
+        Args:
+            tabs: Tab widget that changed its current page
+            index: Index of the current page
+        """
+        page = tabs.widget(index)
+        builder = self._pending_pages.pop(page, None)
+        if builder is not None:
+            # The dialog is already visible here; repaint once the page is complete
+            page.setUpdatesEnabled(False)
+            builder(page)
+            page.setUpdatesEnabled(True)
+
+    def _build_similarity_tab(self, page: QWidget):
+        """Build the similarity tab and load its values."""
+        similarity_layout = _form_layout(page)
 
         self.text_threshold_spin = QSpinBox()
         self.text_threshold_spin.setRange(0, 100)
@@ -179,83 +324,109 @@ class SettingsDialog(QDialog):
         self.binary_threshold_spin.setSuffix("%")
         similarity_layout.addRow(tr("binary_threshold"), self.binary_threshold_spin)
 
-        tabs.addTab(similarity_tab, tr("similarity"))
+        self.strict_comparison_check = QCheckBox(tr("strict_comparison"))
+        self.strict_comparison_check.setToolTip(tr("strict_comparison_tooltip"))
+        similarity_layout.addRow("", self.strict_comparison_check)
 
-        # External tools tab
-        tools_tab = QWidget()
-        tools_layout = QVBoxLayout(tools_tab)
+        self.comparison_workers_spin = QSpinBox()
+        self.comparison_workers_spin.setRange(0, 64)
+        self.comparison_workers_spin.setSpecialValueText(tr("comparison_workers_auto"))
+        self.comparison_workers_spin.setToolTip(tr("comparison_workers_tooltip"))
+        similarity_layout.addRow(tr("comparison_workers"), self.comparison_workers_spin)
 
-        tool_tabs = QTabWidget()
-
-        self.text_tool_widget = ExternalToolWidget("text")
-        tool_tabs.addTab(self.text_tool_widget, tr("tool_text"))
-
-        self.image_tool_widget = ExternalToolWidget("image")
-        tool_tabs.addTab(self.image_tool_widget, tr("tool_image"))
+        self._load_similarity()
 
-        self.binary_tool_widget = ExternalToolWidget("binary")
-        tool_tabs.addTab(self.binary_tool_widget, tr("tool_other"))
+    def _build_tools_tab(self, page: QWidget):
+        """Build the external tools tab; each tool page is in turn built on first display."""
+        tools_layout = QVBoxLayout(page)
 
+        tool_tabs = QTabWidget()
+        for file_type, title_key in zip(EXTERNAL_TOOL_TYPES, ("tool_text", "tool_image", "tool_other")):
+            self._add_lazy_tab(tool_tabs, tr(title_key), partial(self._build_tool_page, file_type))
+        tool_tabs.currentChanged.connect(partial(self._ensure_page_built, tool_tabs))
         tools_layout.addWidget(tool_tabs)
-        tabs.addTab(tools_tab, tr("external_tools"))
-
-        layout.addWidget(tabs)
-
-        # Buttons
-        button_layout = QHBoxLayout()
-        button_layout.addStretch()
 
-        ok_btn = QPushButton(tr("ok"))
-        ok_btn.clicked.connect(self._save_and_close)
-        button_layout.addWidget(ok_btn)
+        # currentChanged is not emitted for the page that is current on insertion
+        self._ensure_page_built(tool_tabs, tool_tabs.currentIndex())
 
-        cancel_btn = QPushButton(tr("cancel"))
-        cancel_btn.clicked.connect(self.reject)
-        button_layout.addWidget(cancel_btn)
+    def _build_tool_page(self, file_type: str, page: QWidget):
+        """
+        Build the external tool page for a file type and load its configuration.
 
-        layout.addLayout(button_layout)
+        Args:
+            file_type: 'text', 'image', or 'binary'
+            page: Placeholder page to fill
+        """
+        page_layout = QVBoxLayout(page)
+        page_layout.setContentsMargins(0, 0, 0, 0)
+        tool_widget = ExternalToolWidget(file_type)
+        page_layout.addWidget(tool_widget)
+        self._tool_widgets[file_type] = tool_widget
+        tool_widget.load_config(self._values[f"external_tool_{file_type}"])
+
+    def reload(self):
+        """Refresh the widgets from storage before the dialog is shown again."""
+        self._load_settings()
 
     def _load_settings(self):
         """Load settings from storage."""
+        # Read everything at once
+        values = self._values = self.settings.load_all()
+
         # Language
-        current_lang = self.settings.get_language()
-        index = self.language_combo.findData(current_lang)
+        index = self._language_index.get(values["language"], -1)
         if index >= 0:
             self.language_combo.setCurrentIndex(index)
 
-        self.dark_mode_check.setChecked(self.settings.get_dark_mode())
-        self.text_ext_edit.setPlainText(self.settings.get_text_extensions())
-        self.image_ext_edit.setPlainText(self.settings.get_image_extensions())
-
-        self.text_threshold_spin.setValue(int(self.settings.get_text_similarity_threshold()))
-        self.image_threshold_spin.setValue(int(self.settings.get_image_similarity_threshold()))
-        self.binary_threshold_spin.setValue(int(self.settings.get_binary_similarity_threshold()))
-
-        self.text_tool_widget.load_config(self.settings.get_external_tool_config("text"))
-        self.image_tool_widget.load_config(self.settings.get_external_tool_config("image"))
-        self.binary_tool_widget.load_config(self.settings.get_external_tool_config("binary"))
+        self.dark_mode_check.setChecked(values["dark_mode"])
+        # setPlainText rebuilds the document and clears undo history even for identical text
+        for edit, key in ((self.text_ext_edit, "text_extensions"), (self.image_ext_edit, "image_extensions")):
+            if edit.toPlainText() != values[key]:
+                edit.setPlainText(values[key])
+
+        # Tabs that have not been built yet load their values when they are
+        if self._similarity_built:
+            self._load_similarity()
+        for file_type, tool_widget in self._tool_widgets.items():
+            tool_widget.load_config(values[f"external_tool_{file_type}"])
+
+    def _load_similarity(self):
+        """Load the similarity tab values from the settings snapshot."""
+        values = self._values
+        self.text_threshold_spin.setValue(int(values["text_similarity_threshold"]))
+        self.image_threshold_spin.setValue(int(values["image_similarity_threshold"]))
+        self.binary_threshold_spin.setValue(int(values["binary_similarity_threshold"]))
+        self.strict_comparison_check.setChecked(values["strict_comparison"])
+        self.comparison_workers_spin.setValue(values["comparison_workers"])
 
     def _save_and_close(self):
         """Save settings and close dialog."""
-        # Language
-        old_lang = self.settings.get_language()
         selected_lang = self.language_combo.currentData()
-        self.settings.set_language(selected_lang)
+        values = {
+            "language": selected_lang,
+            "dark_mode": self.dark_mode_check.isChecked(),
+            "text_extensions": normalize_extensions(self.text_ext_edit.toPlainText()),
+            "image_extensions": normalize_extensions(self.image_ext_edit.toPlainText()),
+        }
 
-        # Emit signal if language changed
-        if old_lang != selected_lang:
-            self.language_changed.emit()
+        # Tabs that were never shown cannot have been edited
+        if self._similarity_built:
+            values["text_similarity_threshold"] = float(self.text_threshold_spin.value())
+            values["image_similarity_threshold"] = float(self.image_threshold_spin.value())
+            values["binary_similarity_threshold"] = float(self.binary_threshold_spin.value())
+            values["strict_comparison"] = self.strict_comparison_check.isChecked()
+            values["comparison_workers"] = self.comparison_workers_spin.value()
 
-        self.settings.set_dark_mode(self.dark_mode_check.isChecked())
-        self.settings.set_text_extensions(self.text_ext_edit.toPlainText())
-        self.settings.set_image_extensions(self.image_ext_edit.toPlainText())
+        for file_type, tool_widget in self._tool_widgets.items():
+            values[f"external_tool_{file_type}"] = tool_widget.get_config()
 
-        self.settings.set_text_similarity_threshold(float(self.text_threshold_spin.value()))
-        self.settings.set_image_similarity_threshold(float(self.image_threshold_spin.value()))
-        self.settings.set_binary_similarity_threshold(float(self.binary_threshold_spin.value()))
+        # Only write what differs from the loaded snapshot; OK without edits writes nothing
+        changed = {key: value for key, value in values.items() if value != self._values[key]}
+        if changed:
+            self.settings.save_all(changed)
 
-        self.settings.set_external_tool_config("text", self.text_tool_widget.get_config())
-        self.settings.set_external_tool_config("image", self.image_tool_widget.get_config())
-        self.settings.set_external_tool_config("binary", self.binary_tool_widget.get_config())
+        # Emit signal if language changed
+        if self._values["language"] != selected_lang:
+            self.language_changed.emit()
 
         self.accept()
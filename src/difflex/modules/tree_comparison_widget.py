@@ -1,32 +1,267 @@
 """Tree-based comparison widget for directory comparison."""
 
-import subprocess
+import os
 from pathlib import Path
 from typing import List, Dict, Optional
-from PySide6.QtWidgets import (
-    QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
-    QTreeWidget, QTreeWidgetItem, QProgressBar, QHeaderView,
-    QAbstractItemView
-)
-from PySide6.QtCore import Qt
+from PySide6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QTreeView, QProgressBar, QHeaderView, QAbstractItemView
+from PySide6.QtCore import Qt, QAbstractItemModel, QModelIndex, QTimer
 from PySide6.QtGui import QColor, QFont
 
-from ..utils.file_types import FileTypeDetector, FileType
+from ..utils.file_types import FileType
 from ..utils.comparator import ComparisonResult
 from ..utils.settings import Settings
 from ..utils.i18n import tr
-from .comparison_worker import DirectoryComparisonWorker, FileComparisonItem
+from ..utils.external_tool import build_tool_args, launch
+from .comparison_worker import DirectoryComparisonWorker, FileComparisonItem, PROGRESS_MESSAGE_KEYS
+
+# Text colors
+COLOR_DIRECTORY = QColor("#6495ED")
+COLOR_PRESENT = QColor("#4CAF50")
+COLOR_ABSENT = QColor("#888888")
+
+# Text and color of each comparison status; the similar status is formatted with its percentage
+RESULT_STYLES = {
+    ComparisonResult.IDENTICAL: ("identical", QColor("#4CAF50")),
+    ComparisonResult.SIMILAR_EXIF: ("similar_exif", QColor("#2196F3")),
+    ComparisonResult.SIMILAR: ("similar_with_percent", QColor("#FFA500")),
+    ComparisonResult.DIFFERENT: ("different", QColor("#F44336")),
+}
+
+# Name column icon per file type
+FILE_ICONS = {
+    FileType.TEXT: "📄",
+    FileType.IMAGE: "🖼️",
+    FileType.BINARY: "📦",
+}
+
+
+class _TreeNode:
+    """Directory or file row of ComparisonTreeModel."""
+
+    __slots__ = ("label", "parent", "item", "row", "children", "directories")
+
+    def __init__(self, label: str, parent: Optional["_TreeNode"], item: FileComparisonItem | None = None):
+        """
+        Initialize tree node.
+
+        Args:
+            label: Text of the name column
+            parent: Parent node (None for the invisible root)
+            item: Compared item for file rows, None for directories
+        """
+        self.label = label
+        self.parent = parent
+        self.item = item
+        self.row = 0
+        self.children: List["_TreeNode"] = []
+        # Child directory nodes by name (directories only)
+        self.directories: Dict[str, "_TreeNode"] | None = {} if item is None else None
+
+
+class ComparisonTreeModel(QAbstractItemModel):
+    """Tree model backed by FileComparisonItem objects; cell contents are produced only when a view asks for them."""
+
+    def __init__(self, num_paths: int, parent=None):
+        """
+        Initialize comparison tree model.
+
+        Args:
+            num_paths: Number of compared locations
+            parent: Parent object
+        """
+        super().__init__(parent)
+        self._root = _TreeNode("", None)
+        # Parent directory node of already added files by relative directory path ("" for the root), so most files need a single lookup
+        self._directories: Dict[str, _TreeNode] = {"": self._root}
+        self._file_nodes: Dict[str, _TreeNode] = {}
+        self._directory_font = QFont()
+        self._directory_font.setBold(True)
+
+        # Columns: name, then location / result pairs
+        self._headers = [tr("file_directory")]
+        for i in range(num_paths):
+            self._headers.append(tr("comparison_location", i + 1))
+            if i < num_paths - 1:
+                self._headers.append(tr("comparison_result"))
+
+    def index(self, row, column, parent=QModelIndex()):
+        """Return the index of a cell under the given parent."""
+        parent_node = parent.internalPointer() if parent.isValid() else self._root
+        if 0 <= row < len(parent_node.children) and 0 <= column < len(self._headers):
+            return self.createIndex(row, column, parent_node.children[row])
+        return QModelIndex()
+
+    def parent(self, index=QModelIndex()):
+        """Return the parent index of a cell."""
+        if not index.isValid():
+            return QModelIndex()
+        return self._index_of(index.internalPointer().parent)
+
+    def rowCount(self, parent=QModelIndex()):
+        """Return number of child rows."""
+        if parent.column() > 0:
+            return 0
+        node = parent.internalPointer() if parent.isValid() else self._root
+        return len(node.children)
+
+    def columnCount(self, parent=QModelIndex()):
+        """Return number of columns."""
+        return len(self._headers)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        """Return header labels."""
+        if orientation == Qt.Orientation.Horizontal and role == Qt.ItemDataRole.DisplayRole:
+            return self._headers[section]
+        return None
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        """Return cell data for the given role."""
+        if not index.isValid():
+            return None
+
+        node = index.internalPointer()
+        column = index.column()
+
+        # Name
+        if column == 0:
+            if role == Qt.ItemDataRole.DisplayRole:
+                return node.label
+            if node.item is None:
+                if role == Qt.ItemDataRole.FontRole:
+                    return self._directory_font
+                if role == Qt.ItemDataRole.ForegroundRole:
+                    return COLOR_DIRECTORY
+            return None
+
+        # Directories only have a name
+        item = node.item
+        if item is None:
+            return None
+
+        # Locations
+        if column % 2 == 1:
+            present = bool(item.paths[(column - 1) // 2])
+            if role == Qt.ItemDataRole.DisplayRole:
+                return "○" if present else "×"
+            if role == Qt.ItemDataRole.ForegroundRole:
+                return COLOR_PRESENT if present else COLOR_ABSENT
+            if role == Qt.ItemDataRole.TextAlignmentRole:
+                return Qt.AlignmentFlag.AlignCenter
+            return None
+
+        # Results (empty until the item has been compared)
+        result_idx = (column - 2) // 2
+        if result_idx >= len(item.results):
+            return None
+        if role == Qt.ItemDataRole.TextAlignmentRole:
+            return Qt.AlignmentFlag.AlignCenter
+
+        result = item.results[result_idx]
+        if result is None:
+            if role == Qt.ItemDataRole.DisplayRole:
+                return "-"
+            if role == Qt.ItemDataRole.ForegroundRole:
+                return COLOR_ABSENT
+            return None
+
+        text_key, color = RESULT_STYLES.get(result.status, RESULT_STYLES[ComparisonResult.DIFFERENT])
+        if role == Qt.ItemDataRole.DisplayRole:
+            if result.status == ComparisonResult.SIMILAR:
+                # Formatted before tr, so equal percentages share one cached translation
+                return tr(text_key, f"{result.similarity:.1f}")
+            return tr(text_key)
+        if role == Qt.ItemDataRole.ForegroundRole:
+            return color
+        return None
+
+    def add_items(self, items: List[FileComparisonItem]):
+        """
+        Add file rows, creating their parent directory rows as needed.
+
+        Consecutive files of the same directory are inserted together.
+
+        Args:
+            items: Items to add
+        """
+        batch_parent = self._root
+        batch: List[_TreeNode] = []
+        for item in items:
+            # Names are relative paths as listed by the worker, so they use the native separator
+            directory, _, file_name = item.name.rpartition(os.sep)
+            parent = self._directories.get(directory)
+            if parent is None or parent is not batch_parent:
+                self._insert_nodes(batch_parent, batch)
+                batch = []
+                if parent is None:
+                    parent = self._make_directories(directory)
+                batch_parent = parent
+
+            icon = FILE_ICONS.get(item.file_type, FILE_ICONS[FileType.TEXT])
+            node = _TreeNode(f"{icon} {file_name}", parent, item)
+            self._file_nodes[item.name] = node
+            batch.append(node)
+        self._insert_nodes(batch_parent, batch)
+
+    def refresh_results(self, items: List[FileComparisonItem]):
+        """
+        Notify views that results of the given items changed, with one signal per parent directory.
+
+        Args:
+            items: Items whose results were updated
+        """
+        rows_by_parent: Dict[_TreeNode, List[int]] = {}
+        for item in items:
+            node = self._file_nodes.get(item.name)
+            if node is not None:
+                rows_by_parent.setdefault(node.parent, []).append(node.row)
+
+        last_column = len(self._headers) - 1
+        for parent_node, rows in rows_by_parent.items():
+            parent = self._index_of(parent_node)
+            self.dataChanged.emit(self.index(min(rows), 0, parent), self.index(max(rows), last_column, parent))
+
+    def item_at(self, index: QModelIndex) -> FileComparisonItem | None:
+        """Return the item shown at an index, or None for directories."""
+        if not index.isValid():
+            return None
+        return index.internalPointer().item
+
+    def _index_of(self, node: _TreeNode) -> QModelIndex:
+        """Return the first-column index of a node."""
+        if node is self._root:
+            return QModelIndex()
+        return self.createIndex(node.row, 0, node)
+
+    def _make_directories(self, directory: str) -> _TreeNode:
+        """Return the directory node for a relative directory path, inserting missing levels."""
+        # Walk down one name per level instead of looking up ever longer path prefixes
+        node = self._root
+        for name in directory.split(os.sep):
+            child = node.directories.get(name)
+            if child is None:
+                child = _TreeNode(f"📁 {name}", node)
+                self._insert_nodes(node, [child])
+                node.directories[name] = child
+            node = child
+        self._directories[directory] = node
+        return node
+
+    def _insert_nodes(self, parent: _TreeNode, nodes: List[_TreeNode]):
+        """Append nodes as children of a parent in one insertion."""
+        if not nodes:
+            return
+        first_row = len(parent.children)
+        self.beginInsertRows(self._index_of(parent), first_row, first_row + len(nodes) - 1)
+        for offset, node in enumerate(nodes):
+            node.row = first_row + offset
+        parent.children.extend(nodes)
+        self.endInsertRows()
 
 
 class ComparisonTreeWidget(QWidget):
     """Widget for displaying directory comparison in tree view."""
 
-    def __init__(
-        self,
-        paths: List[str],
-        settings: Settings,
-        parent=None
-    ):
+    def __init__(self, paths: List[str], settings: Settings, parent=None):
         """
         Initialize comparison tree widget.
 
@@ -39,14 +274,17 @@ class ComparisonTreeWidget(QWidget):
         self.paths = [Path(p) for p in paths]
         self.settings = settings
         self.worker = None
-        self.items_map: Dict[str, QTreeWidgetItem] = {}
+        self._pending_rows: List[FileComparisonItem] = []
+        self._pending_results: List[FileComparisonItem] = []
+
+        # Coalesce worker signals into batched model updates
+        self._flush_timer = QTimer(self)
+        self._flush_timer.setSingleShot(True)
+        self._flush_timer.setInterval(50)
+        self._flush_timer.timeout.connect(self._flush_rows)
 
         # Setup file type detector
-        text_exts = set(self.settings.get_text_extensions().split('\n'))
-        text_exts = {ext.strip() for ext in text_exts if ext.strip()}
-        image_exts = set(self.settings.get_image_extensions().split('\n'))
-        image_exts = {ext.strip() for ext in image_exts if ext.strip()}
-        self.detector = FileTypeDetector(text_exts, image_exts)
+        self.detector = self.settings.get_file_type_detector()
 
         self._setup_ui()
         self._start_directory_comparison()
@@ -56,10 +294,7 @@ class ComparisonTreeWidget(QWidget):
         layout = QVBoxLayout(self)
 
         # Header
-        header = QLabel(
-            tr("directory_comparison") + ": " +
-            " vs ".join([p.name for p in self.paths])
-        )
+        header = QLabel(tr("directory_comparison") + ": " + " vs ".join([p.name for p in self.paths]))
         header.setStyleSheet("font-weight: bold; font-size: 12px;")
         layout.addWidget(header)
 
@@ -69,28 +304,18 @@ class ComparisonTreeWidget(QWidget):
         layout.addWidget(self.progress_label)
         layout.addWidget(self.progress_bar)
 
-        # Tree widget
-        self.tree = QTreeWidget()
+        # Tree view
+        num_paths = len(self.paths)
+        self.model = ComparisonTreeModel(num_paths, self)
+        self.tree = QTreeView()
+        self.tree.setModel(self.model)
+        self.tree.setUniformRowHeights(True)
         self.tree.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
         self.tree.setAlternatingRowColors(True)
-        self.tree.itemDoubleClicked.connect(self._on_item_double_clicked)
-
-        # Setup columns
-        num_paths = len(self.paths)
-        num_result_cols = num_paths - 1
-        total_cols = 1 + num_paths + num_result_cols  # name + paths + results
-
-        self.tree.setColumnCount(total_cols)
-        headers = [tr("file_directory")]
-
-        for i, path in enumerate(self.paths):
-            headers.append(tr("comparison_location", i+1))
-            if i < num_paths - 1:
-                headers.append(tr("comparison_result"))
-
-        self.tree.setHeaderLabels(headers)
+        self.tree.doubleClicked.connect(self._on_item_double_clicked)
 
         # Set column widths
+        total_cols = self.model.columnCount()
         self.tree.header().setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
         for i in range(1, total_cols):
             if (i - 1) % 2 == 1:  # Result columns
@@ -133,144 +358,49 @@ class ComparisonTreeWidget(QWidget):
         binary_threshold = self.settings.get_binary_similarity_threshold()
 
         self.worker = DirectoryComparisonWorker(
-            self.paths,
-            self.detector,
-            text_threshold,
-            image_threshold,
-            binary_threshold
+            self.paths, self.detector, text_threshold, image_threshold, binary_threshold, self.settings.get_comparison_workers() or None
         )
 
         self.worker.progress.connect(self._on_progress)
-        self.worker.file_found.connect(self._on_file_found)
+        self.worker.files_found.connect(self._on_files_found)
         self.worker.comparison_complete.connect(self._on_comparison_complete)
         self.worker.finished.connect(self._on_finished)
 
         self.worker.start()
 
-    def _get_or_create_parent_item(self, path_parts: List[str]) -> Optional[QTreeWidgetItem]:
-        """
-        Get or create parent tree item for the given path.
-
-        Args:
-            path_parts: List of path components
-
-        Returns:
-            Parent tree item or None for root
-        """
-        if not path_parts:
-            return None
-
-        parent = None
-        current_path = ""
-
-        for part in path_parts:
-            current_path = f"{current_path}/{part}" if current_path else part
-
-            if current_path not in self.items_map:
-                # Create directory item
-                if parent is None:
-                    item = QTreeWidgetItem(self.tree)
-                else:
-                    item = QTreeWidgetItem(parent)
-
-                item.setText(0, f"📁 {part}")
-
-                # Make directory items bold
-                font = item.font(0)
-                font.setBold(True)
-                item.setFont(0, font)
-
-                # Set icon color for directory
-                item.setForeground(0, QColor("#6495ED"))
-
-                self.items_map[current_path] = item
-                parent = item
-            else:
-                parent = self.items_map[current_path]
-
-        return parent
-
-    def _on_progress(self, current: int, total: int, message: str):
+    def _on_progress(self, current: int, total: int, code: int, arg: str):
         """Handle progress update."""
         self.progress_bar.setMaximum(total)
         self.progress_bar.setValue(current)
-        self.progress_label.setText(message)
-
-    def _on_file_found(self, item: FileComparisonItem):
-        """Handle file found."""
-        # Parse path to get directory structure
-        path_obj = Path(item.name)
-        path_parts = list(path_obj.parts[:-1])  # All except filename
-        filename = path_obj.name
-
-        # Get or create parent
-        parent = self._get_or_create_parent_item(path_parts)
-
-        # Create file item
-        if parent is None:
-            tree_item = QTreeWidgetItem(self.tree)
-        else:
-            tree_item = QTreeWidgetItem(parent)
-
-        # Set filename with icon
-        file_icon = "📄"
-        if item.file_type == FileType.IMAGE:
-            file_icon = "🖼️"
-        elif item.file_type == FileType.BINARY:
-            file_icon = "📦"
-
-        tree_item.setText(0, f"{file_icon} {filename}")
-
-        # Store the item for later updates
-        self.items_map[item.name] = tree_item
-
-        # Add path information
-        num_paths = len(item.paths)
-        for i, path in enumerate(item.paths):
-            col_idx = 1 + i * 2
-            if path:
-                tree_item.setText(col_idx, "○")
-                tree_item.setForeground(col_idx, QColor("#4CAF50"))
-            else:
-                tree_item.setText(col_idx, "×")
-                tree_item.setForeground(col_idx, QColor("#888888"))
-            tree_item.setTextAlignment(col_idx, Qt.AlignmentFlag.AlignCenter)
-
-        # Store file paths in item data
-        tree_item.setData(0, Qt.ItemDataRole.UserRole, item.paths)
+        self.progress_label.setText(tr(PROGRESS_MESSAGE_KEYS[code], arg))
+
+    def _on_files_found(self, items: List[FileComparisonItem]):
+        """Handle a batch of found files."""
+        self._pending_rows.extend(items)
+        self._schedule_flush()
 
     def _on_comparison_complete(self, item: FileComparisonItem, results: List):
         """Handle comparison complete."""
-        tree_item = self.items_map.get(item.name)
-        if not tree_item:
-            return
+        self._pending_results.append(item)
+        self._schedule_flush()
+
+    def _schedule_flush(self):
+        """Start the flush timer if it is not already pending."""
+        if not self._flush_timer.isActive():
+            self._flush_timer.start()
+
+    def _flush_rows(self):
+        """Apply buffered rows and results to the model in a single batch."""
+        rows, self._pending_rows = self._pending_rows, []
+        results, self._pending_results = self._pending_results, []
 
-        # Add results with color-coded text
-        for i, result in enumerate(results):
-            col_idx = 2 + i * 2
-
-            if result is None:
-                tree_item.setText(col_idx, "-")
-                tree_item.setForeground(col_idx, QColor("#888888"))
-            else:
-                # Use symbols and colors for better visibility
-                if result.status == ComparisonResult.IDENTICAL:
-                    tree_item.setText(col_idx, tr("identical"))
-                    tree_item.setForeground(col_idx, QColor("#4CAF50"))
-                elif result.status == ComparisonResult.SIMILAR_EXIF:
-                    tree_item.setText(col_idx, tr("similar_exif"))
-                    tree_item.setForeground(col_idx, QColor("#2196F3"))
-                elif result.status == ComparisonResult.SIMILAR:
-                    tree_item.setText(col_idx, tr("similar_with_percent", result.similarity))
-                    tree_item.setForeground(col_idx, QColor("#FFA500"))
-                else:
-                    tree_item.setText(col_idx, tr("different"))
-                    tree_item.setForeground(col_idx, QColor("#F44336"))
-
-            tree_item.setTextAlignment(col_idx, Qt.AlignmentFlag.AlignCenter)
+        self.model.add_items(rows)
+        self.model.refresh_results(results)
 
     def _on_finished(self):
         """Handle worker finished."""
+        self._flush_timer.stop()
+        self._flush_rows()
         self.stop_btn.setEnabled(False)
         self.open_btn.setEnabled(True)
         self.tree.expandToDepth(0)  # Expand first level by default
@@ -280,48 +410,27 @@ class ComparisonTreeWidget(QWidget):
         if self.worker:
             self.worker.stop()
 
-    def _on_item_double_clicked(self, item: QTreeWidgetItem, column: int):
+    def _on_item_double_clicked(self, index: QModelIndex):
         """Handle item double click."""
         # Only open files, not directories
-        text = item.text(0)
-        if text.startswith("📁"):
+        if self.model.item_at(index) is None:
             return
 
         self._open_in_external_tool()
 
     def _open_in_external_tool(self):
         """Open selected files in external tool."""
-        current_item = self.tree.currentItem()
-        if not current_item:
+        # Directories have no item
+        item = self.model.item_at(self.tree.currentIndex())
+        if item is None:
             return
 
-        # Check if it's a file (not directory)
-        if current_item.text(0).startswith("📁"):
+        file_paths = item.paths
+        if not any(file_paths):
             return
 
-        # Get file paths from item data
-        file_paths = current_item.data(0, Qt.ItemDataRole.UserRole)
-        if not file_paths:
-            return
-
-        # Filter out None values but keep track of positions
-        valid_paths = [str(p) if p else None for p in file_paths]
-
-        # Determine file type
-        file_type = None
-        for path in file_paths:
-            if path:
-                detected = self.detector.detect(Path(path))
-                if detected == FileType.TEXT:
-                    file_type = "text"
-                elif detected == FileType.IMAGE:
-                    file_type = "image"
-                else:
-                    file_type = "binary"
-                break
-
-        if not file_type:
-            return
+        # File type was detected once by the worker
+        file_type = item.file_type.value
 
         # Get external tool config
         config = self.settings.get_external_tool_config(file_type)
@@ -330,40 +439,10 @@ class ComparisonTreeWidget(QWidget):
         if not executable:
             return
 
-        # Build command
-        args = []
-
-        arg_before = config.get("arg_before", "").strip()
-        if arg_before:
-            args.append(arg_before)
-
-        arg_templates = [
-            config.get("arg1", "%s"),
-            config.get("arg2", "%s"),
-            config.get("arg3", "%s")
-        ]
-
-        pack_args = config.get("pack_args", False)
-
-        if pack_args:
-            # Pack arguments (remove gaps)
-            for path in valid_paths:
-                if path and arg_templates:
-                    template = arg_templates.pop(0)
-                    args.append(template.replace("%s", path))
-        else:
-            # Use arguments as-is
-            for i, (path, template) in enumerate(zip(valid_paths, arg_templates)):
-                if i < len(valid_paths) and valid_paths[i]:
-                    args.append(template.replace("%s", valid_paths[i]))
-
-        arg_after = config.get("arg_after", "").strip()
-        if arg_after:
-            args.append(arg_after)
-
         # Execute
         try:
-            subprocess.Popen([executable] + args)
+            # Missing files stay None so build_tool_args keeps each path in its position
+            launch(executable, build_tool_args(config, file_paths))
         except Exception as e:
             print(f"Failed to open external tool: {e}")
 
@@ -1,10 +1,31 @@
 """File comparison utilities."""
 
 import difflib
+import hashlib
+import mmap
+import os
+import re
+import threading
+from collections import OrderedDict
+from functools import lru_cache
 from pathlib import Path
 from PIL import Image
 import numpy as np
 
+# Bytes read per chunk when streaming files
+CHUNK_SIZE = 1 << 20
+# Encodings tried in order when reading text files
+TEXT_ENCODINGS = ("utf-8", "utf-8-sig", "shift-jis", "cp932", "latin-1")
+# Whitespace at the end of each line, as str.rstrip would remove it
+TRAILING_WHITESPACE = re.compile(r"[^\S\n]+$", re.MULTILINE)
+# Text length (characters) above which similarity is computed over lines instead of characters
+LINE_MATCH_THRESHOLD = 1 << 20
+# Images with at least this many pixels are first checked on copies reduced by PREVIEW_FACTOR
+PREVIEW_MIN_PIXELS = 4_000_000
+PREVIEW_FACTOR = 8
+# Number of comparison results kept for the session by cached_compare
+RESULT_CACHE_SIZE = 10000
+
 
 class ComparisonResult:
     """Result of a file comparison."""
@@ -14,7 +35,7 @@ class ComparisonResult:
     SIMILAR_EXIF = "≒EX"
     DIFFERENT = "≠"
 
-    def __init__(self, status: str, similarity: float = 100.0, details: str = ""):
+    def __init__(self, status: str, similarity: float = 100.0, details: str = "", error: bool = False):
         """
         Initialize comparison result.
 
@@ -22,10 +43,12 @@ class ComparisonResult:
             status: One of IDENTICAL, SIMILAR, SIMILAR_EXIF, DIFFERENT
             similarity: Similarity percentage (0-100)
             details: Additional details about the comparison
+            error: True if the files could not be compared (for example locked or unreadable)
         """
         self.status = status
         self.similarity = similarity
         self.details = details
+        self.error = error
 
     def __str__(self) -> str:
         """String representation."""
@@ -37,6 +60,146 @@ class ComparisonResult:
             return self.DIFFERENT
 
 
+@lru_cache(maxsize=1024)
+def _file_digest(path: str, size: int, mtime_ns: int) -> bytes:
+    """
+    Hash a file's content in chunks.
+
+    Size and modification time are part of the cache key, so a file that changes on disk is hashed again.
+
+    Args:
+        path: File path
+        size: File size in bytes (cache key only)
+        mtime_ns: Modification time in nanoseconds (cache key only)
+
+    Returns:
+        128-bit BLAKE2b digest
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        while chunk := f.read(CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.digest()
+
+
+def _same_inode(stat1: os.stat_result, stat2: os.stat_result) -> bool:
+    """
+    Check whether two stat results describe the same file, such as one file reached through a hard link.
+
+    Args:
+        stat1: Stat result of the first file
+        stat2: Stat result of the second file
+
+    Returns:
+        True if both are the same inode on the same device
+    """
+    # Some file systems report no inode numbers (0), which must not match each other
+    return stat1.st_ino != 0 and stat1.st_ino == stat2.st_ino and stat1.st_dev == stat2.st_dev
+
+
+def _stat_pair(file1: Path, file2: Path, stats: tuple[os.stat_result, os.stat_result] | None) -> tuple[os.stat_result, os.stat_result]:
+    """Get the stat results of two files, statting them only if they are not already known."""
+    if stats is not None:
+        return stats
+    return os.stat(file1), os.stat(file2)
+
+
+def _same_content(file1: Path, file2: Path, stat1: os.stat_result, stat2: os.stat_result) -> bool:
+    """
+    Check whether two files have identical bytes.
+
+    Files of different size are rejected without being read. Otherwise their digests are compared; digests are
+    cached, so a file compared against several others (as in a 3-way comparison) is read only once.
+
+    Args:
+        file1: First file path
+        file2: Second file path
+        stat1: Stat result of the first file
+        stat2: Stat result of the second file
+
+    Returns:
+        True if both files have the same content
+    """
+    if stat1.st_size != stat2.st_size:
+        return False
+    digest1 = _file_digest(os.fspath(file1), stat1.st_size, stat1.st_mtime_ns)
+    return digest1 == _file_digest(os.fspath(file2), stat2.st_size, stat2.st_mtime_ns)
+
+
+def _count_matching_bytes(file1: Path, file2: Path, similarity_threshold: float = 0.0) -> tuple[int, bool]:
+    """
+    Count the positions at which two non-empty files have the same byte.
+
+    Both files are memory-mapped and compared chunk by chunk, so neither is copied into memory. Counting stops
+    as soon as the similarity (matching bytes over the longer length) can no longer reach the threshold.
+    The mappings are closed before returning; on Windows an open mapping keeps the file locked.
+
+    Args:
+        file1: First file path
+        file2: Second file path
+        similarity_threshold: Similarity percentage below which counting may stop early
+
+    Returns:
+        Number of matching byte positions within the shorter file and whether it is exact; when counting stopped
+        early it is an upper bound whose similarity is below the threshold
+    """
+    with (
+        open(file1, "rb") as f1,
+        open(file2, "rb") as f2,
+        mmap.mmap(f1.fileno(), 0, access=mmap.ACCESS_READ) as map1,
+        mmap.mmap(f2.fileno(), 0, access=mmap.ACCESS_READ) as map2,
+    ):
+        bytes1 = np.frombuffer(map1, dtype=np.uint8)
+        bytes2 = np.frombuffer(map2, dtype=np.uint8)
+        try:
+            return _count_matching_array_bytes(bytes1, bytes2, similarity_threshold)
+        finally:
+            # A mapping cannot be closed while an array still views it
+            del bytes1, bytes2
+
+
+def _count_matching_array_bytes(bytes1: np.ndarray, bytes2: np.ndarray, similarity_threshold: float) -> tuple[int, bool]:
+    """Count matching byte positions of two uint8 arrays chunk by chunk; see _count_matching_bytes."""
+    min_len = min(bytes1.size, bytes2.size)
+    max_len = max(bytes1.size, bytes2.size)
+
+    matching_bytes = 0
+    for start in range(0, min_len, CHUNK_SIZE):
+        end = min(start + CHUNK_SIZE, min_len)
+        matching_bytes += int(np.count_nonzero(bytes1[start:end] == bytes2[start:end]))
+        # Every position not compared yet could still match, so this is the best the files can do
+        upper_bound = matching_bytes + (min_len - end)
+        if end < min_len and upper_bound / max_len * 100.0 < similarity_threshold:
+            return upper_bound, False
+    return matching_bytes, True
+
+
+def _decode_file(path: Path) -> str | None:
+    """
+    Read a text file, trying the supported encodings in order.
+
+    The file is read once and each encoding is tried on the same bytes. Newlines are translated
+    the same way as reading in text mode.
+
+    Args:
+        path: File path
+
+    Returns:
+        Decoded text, or None if no encoding applies
+    """
+    if os.path.getsize(path) == 0:
+        return ""
+    # Decode straight from a mapping of the file, so no bytes copy is held next to the decoded text
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        for encoding in TEXT_ENCODINGS:
+            try:
+                text = str(data, encoding)
+            except UnicodeDecodeError:
+                continue
+            return text.replace("\r\n", "\n").replace("\r", "\n")
+    return None
+
+
 class TextComparator:
     """Compare text files."""
 
@@ -51,14 +214,13 @@ class TextComparator:
         Returns:
             Normalized text
         """
-        # Normalize line endings
-        lines = text.replace('\r\n', '\n').replace('\r', '\n').split('\n')
-        # Strip trailing whitespace from each line
-        lines = [line.rstrip() for line in lines]
-        return '\n'.join(lines)
+        # Normalize line endings (replace returns the same string when there is nothing to replace)
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+        # Strip trailing whitespace from each line in one pass instead of splitting and rejoining
+        return TRAILING_WHITESPACE.sub("", text)
 
     @staticmethod
-    def compare(file1: Path, file2: Path, similarity_threshold: float = 95.0) -> ComparisonResult:
+    def compare(file1: Path, file2: Path, similarity_threshold: float = 95.0, stats: tuple[os.stat_result, os.stat_result] | None = None) -> ComparisonResult:
         """
         Compare two text files.
 
@@ -66,30 +228,27 @@ class TextComparator:
             file1: First file path
             file2: Second file path
             similarity_threshold: Threshold for considering files similar (0-100)
+            stats: Stat results of both files if already known, so they are not statted again
 
         Returns:
             ComparisonResult object
         """
         try:
-            # Read files with various encodings
-            for encoding in ['utf-8', 'utf-8-sig', 'shift-jis', 'cp932', 'latin-1']:
-                try:
-                    with open(file1, 'r', encoding=encoding) as f:
-                        text1 = f.read()
-                    break
-                except UnicodeDecodeError:
-                    continue
-            else:
+            # Stat metadata settles hard links without any reads
+            stat1, stat2 = _stat_pair(file1, file2, stats)
+            if _same_inode(stat1, stat2):
+                return ComparisonResult(ComparisonResult.IDENTICAL, 100.0, "Same file")
+
+            # Byte-identical files need no decoding or diffing
+            if _same_content(file1, file2, stat1, stat2):
+                return ComparisonResult(ComparisonResult.IDENTICAL, 100.0)
+
+            text1 = _decode_file(file1)
+            if text1 is None:
                 return ComparisonResult(ComparisonResult.DIFFERENT, 0.0, "Cannot decode file1")
 
-            for encoding in ['utf-8', 'utf-8-sig', 'shift-jis', 'cp932', 'latin-1']:
-                try:
-                    with open(file2, 'r', encoding=encoding) as f:
-                        text2 = f.read()
-                    break
-                except UnicodeDecodeError:
-                    continue
-            else:
+            text2 = _decode_file(file2)
+            if text2 is None:
                 return ComparisonResult(ComparisonResult.DIFFERENT, 0.0, "Cannot decode file2")
 
             # Exact match
@@ -103,8 +262,12 @@ class TextComparator:
             if norm1 == norm2:
                 return ComparisonResult(ComparisonResult.SIMILAR, 100.0, "Whitespace/newline differences only")
 
-            # Calculate similarity
-            similarity = difflib.SequenceMatcher(None, norm1, norm2).ratio() * 100
+            # Calculate similarity; large texts are matched line by line, as character matching grows quadratically
+            if max(len(norm1), len(norm2)) > LINE_MATCH_THRESHOLD:
+                matcher = difflib.SequenceMatcher(None, norm1.split("\n"), norm2.split("\n"))
+            else:
+                matcher = difflib.SequenceMatcher(None, norm1, norm2)
+            similarity = matcher.ratio() * 100
 
             if similarity >= similarity_threshold:
                 return ComparisonResult(ComparisonResult.SIMILAR, similarity, "Content mostly similar")
@@ -112,14 +275,46 @@ class TextComparator:
                 return ComparisonResult(ComparisonResult.DIFFERENT, similarity, "Content differs significantly")
 
         except Exception as e:
-            return ComparisonResult(ComparisonResult.DIFFERENT, 0.0, f"Error: {str(e)}")
+            return ComparisonResult(ComparisonResult.DIFFERENT, 0.0, f"Error: {str(e)}", error=True)
+
+
+def _similarity_upper_bound(img1: Image.Image, img2: Image.Image) -> float | None:
+    """
+    Bound the pixel similarity of two images of equal size and mode from box-reduced copies.
+
+    The difference of two block averages never exceeds the average difference within the block, so the mean
+    difference of the reduced images (less 1 for their integer rounding) is a lower bound of the full one.
+
+    Args:
+        img1: First image
+        img2: Second image
+
+    Returns:
+        Upper bound of the similarity percentage, or None if the images cannot be reduced
+    """
+    # Only whole blocks are reduced; the cropped margin is counted as identical
+    width = img1.width - img1.width % PREVIEW_FACTOR
+    height = img1.height - img1.height % PREVIEW_FACTOR
+    box = (0, 0, width, height)
+    try:
+        small1 = np.asarray(img1.crop(box).reduce(PREVIEW_FACTOR))
+        small2 = np.asarray(img2.crop(box).reduce(PREVIEW_FACTOR))
+    except ValueError:
+        # Mode not supported by reduce
+        return None
+    if small1.dtype != np.uint8:
+        return None
+
+    block_diff = np.abs(np.subtract(small1, small2, dtype=np.int16)).mean()
+    min_diff = max(0.0, float(block_diff) - 1.0) * (width * height) / (img1.width * img1.height)
+    return 100.0 - (min_diff / 255.0 * 100.0)
 
 
 class ImageComparator:
     """Compare image files."""
 
     @staticmethod
-    def compare(file1: Path, file2: Path, similarity_threshold: float = 99.0) -> ComparisonResult:
+    def compare(file1: Path, file2: Path, similarity_threshold: float = 99.0, stats: tuple[os.stat_result, os.stat_result] | None = None) -> ComparisonResult:
         """
         Compare two image files.
 
@@ -127,18 +322,18 @@ class ImageComparator:
             file1: First image path
             file2: Second image path
             similarity_threshold: Threshold for considering images similar (0-100)
+            stats: Stat results of both files if already known, so they are not statted again
 
         Returns:
             ComparisonResult object
         """
         try:
-            # Binary comparison first
-            with open(file1, 'rb') as f:
-                data1 = f.read()
-            with open(file2, 'rb') as f:
-                data2 = f.read()
+            stat1, stat2 = _stat_pair(file1, file2, stats)
+            if _same_inode(stat1, stat2):
+                return ComparisonResult(ComparisonResult.IDENTICAL, 100.0, "Same file")
 
-            if data1 == data2:
+            # Binary comparison first; files of different size are not read at all
+            if _same_content(file1, file2, stat1, stat2):
                 return ComparisonResult(ComparisonResult.IDENTICAL, 100.0)
 
             # Open images
@@ -153,18 +348,33 @@ class ImageComparator:
             if img1.mode != img2.mode:
                 img2 = img2.convert(img1.mode)
 
-            # Compare pixels
-            arr1 = np.array(img1)
-            arr2 = np.array(img2)
+            # Large images that are clearly different are settled on reduced copies
+            if img1.width * img1.height >= PREVIEW_MIN_PIXELS:
+                bound = _similarity_upper_bound(img1, img2)
+                if bound is not None and bound < similarity_threshold:
+                    return ComparisonResult(ComparisonResult.DIFFERENT, bound, "Pixels differ significantly (estimated from reduced images)")
+
+            # Compare pixels: one absolute difference pass decides both pixel identity and similarity
+            arr1 = np.asarray(img1)
+            arr2 = np.asarray(img2)
+
+            if arr1.dtype == np.uint8:
+                # int16 holds every uint8 difference, so no float64 copies of either image are needed
+                diff = np.subtract(arr1, arr2, dtype=np.int16)
+                np.abs(diff, out=diff)
+                total_diff = float(diff.sum(dtype=np.int64))
+                max_diff = 255.0
+            else:
+                diff = np.abs(arr1.astype(float) - arr2.astype(float))
+                total_diff = float(diff.sum())
+                max_diff = float(np.iinfo(arr1.dtype).max)
 
-            if np.array_equal(arr1, arr2):
+            if total_diff == 0:
                 # Pixels identical but file different (EXIF, metadata, etc.)
                 return ComparisonResult(ComparisonResult.SIMILAR_EXIF, 100.0, "Pixel data identical, metadata differs")
 
             # Calculate pixel difference
-            diff = np.abs(arr1.astype(float) - arr2.astype(float))
-            max_diff = 255.0 if arr1.dtype == np.uint8 else float(np.iinfo(arr1.dtype).max)
-            similarity = 100.0 - (np.mean(diff) / max_diff * 100.0)
+            similarity = 100.0 - (total_diff / diff.size / max_diff * 100.0)
 
             if similarity >= similarity_threshold:
                 return ComparisonResult(ComparisonResult.SIMILAR, similarity, "Pixels mostly similar")
@@ -172,14 +382,14 @@ class ImageComparator:
                 return ComparisonResult(ComparisonResult.DIFFERENT, similarity, "Pixels differ significantly")
 
         except Exception as e:
-            return ComparisonResult(ComparisonResult.DIFFERENT, 0.0, f"Error: {str(e)}")
+            return ComparisonResult(ComparisonResult.DIFFERENT, 0.0, f"Error: {str(e)}", error=True)
 
 
 class BinaryComparator:
     """Compare binary files."""
 
     @staticmethod
-    def compare(file1: Path, file2: Path, similarity_threshold: float = 100.0) -> ComparisonResult:
+    def compare(file1: Path, file2: Path, similarity_threshold: float = 100.0, stats: tuple[os.stat_result, os.stat_result] | None = None) -> ComparisonResult:
         """
         Compare two binary files.
 
@@ -187,22 +397,19 @@ class BinaryComparator:
             file1: First file path
             file2: Second file path
             similarity_threshold: Threshold for considering files similar (0-100)
+            stats: Stat results of both files if already known, so they are not statted again
 
         Returns:
             ComparisonResult object
         """
         try:
-            with open(file1, 'rb') as f:
-                data1 = f.read()
-            with open(file2, 'rb') as f:
-                data2 = f.read()
+            # Stat metadata decides hard links and the empty cases without opening either file
+            stat1, stat2 = _stat_pair(file1, file2, stats)
+            if _same_inode(stat1, stat2):
+                return ComparisonResult(ComparisonResult.IDENTICAL, 100.0, "Same file")
 
-            if data1 == data2:
-                return ComparisonResult(ComparisonResult.IDENTICAL, 100.0)
-
-            # Calculate byte-level similarity
-            len1 = len(data1)
-            len2 = len(data2)
+            len1 = stat1.st_size
+            len2 = stat2.st_size
 
             if len1 == 0 and len2 == 0:
                 return ComparisonResult(ComparisonResult.IDENTICAL, 100.0)
@@ -210,18 +417,94 @@ class BinaryComparator:
             if len1 == 0 or len2 == 0:
                 return ComparisonResult(ComparisonResult.DIFFERENT, 0.0, "One file is empty")
 
-            # Compare byte by byte
-            min_len = min(len1, len2)
-            matching_bytes = sum(1 for i in range(min_len) if data1[i] == data2[i])
+            # Byte similarity can never exceed min/max size (below 100 whenever sizes differ), so the sizes alone may decide
+            if len1 != len2:
+                size_bound = min(len1, len2) / max(len1, len2) * 100.0
+                if size_bound < similarity_threshold:
+                    return ComparisonResult(ComparisonResult.DIFFERENT, size_bound, f"File sizes differ: {len1} vs {len2}")
+
+            # Compare byte by byte, streaming both files until the threshold is out of reach
+            matching_bytes, exact = _count_matching_bytes(file1, file2, similarity_threshold)
+
+            if len1 == len2 == matching_bytes:
+                return ComparisonResult(ComparisonResult.IDENTICAL, 100.0)
 
             # Account for length difference
             max_len = max(len1, len2)
             similarity = (matching_bytes / max_len) * 100.0
 
+            if not exact:
+                return ComparisonResult(ComparisonResult.DIFFERENT, similarity, "Binary data differs (stopped early, similarity is an upper bound)")
+
             if similarity >= similarity_threshold:
                 return ComparisonResult(ComparisonResult.SIMILAR, similarity, "Binary data mostly similar")
             else:
                 return ComparisonResult(ComparisonResult.DIFFERENT, similarity, "Binary data differs")
 
         except Exception as e:
-            return ComparisonResult(ComparisonResult.DIFFERENT, 0.0, f"Error: {str(e)}")
+            return ComparisonResult(ComparisonResult.DIFFERENT, 0.0, f"Error: {str(e)}", error=True)
+
+
+# Session cache of comparison results, least recently used first; shared by the comparison worker threads
+_result_cache: OrderedDict[tuple, ComparisonResult] = OrderedDict()
+_result_cache_lock = threading.Lock()
+
+
+def cached_compare(
+    comparator: type, file1: Path, file2: Path, similarity_threshold: float, stats: tuple[os.stat_result, os.stat_result] | None = None
+) -> ComparisonResult:
+    """
+    Compare two files, reusing the result of an earlier comparison of the same unchanged files.
+
+    Results are keyed by both paths with their modification times and sizes, the comparator and the threshold,
+    so re-running a comparison only recompares files that changed since.
+
+    Args:
+        comparator: TextComparator, ImageComparator or BinaryComparator
+        file1: First file path
+        file2: Second file path
+        similarity_threshold: Threshold for considering files similar (0-100)
+        stats: Stat results of both files if already known, so they are not statted again
+
+    Returns:
+        ComparisonResult object
+    """
+    try:
+        stat1, stat2 = _stat_pair(file1, file2, stats)
+    except OSError:
+        # Let the comparator report the error
+        return comparator.compare(file1, file2, similarity_threshold)
+
+    key = (
+        os.fspath(file1),
+        stat1.st_mtime_ns,
+        stat1.st_size,
+        os.fspath(file2),
+        stat2.st_mtime_ns,
+        stat2.st_size,
+        comparator.__name__,
+        similarity_threshold,
+    )
+    with _result_cache_lock:
+        result = _result_cache.get(key)
+        if result is not None:
+            _result_cache.move_to_end(key)
+            return result
+
+    result = comparator.compare(file1, file2, similarity_threshold, (stat1, stat2))
+    if result.error:
+        # Errors are often transient (a locked file, a missing permission), so the next run tries again
+        return result
+
+    with _result_cache_lock:
+        _result_cache[key] = result
+        if len(_result_cache) > RESULT_CACHE_SIZE:
+            _result_cache.popitem(last=False)
+    return result
+
+
+def clear_comparison_cache() -> None:
+    """Forget all cached comparison results and file digests, so every file is read again."""
+    with _result_cache_lock:
+        _result_cache.clear()
+    _file_digest.cache_clear()
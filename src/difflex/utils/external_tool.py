@@ -0,0 +1,72 @@
+"""External tool launching utilities."""
+
+import os
+import shutil
+import subprocess
+from functools import lru_cache
+from typing import Any, List
+
+
+@lru_cache(maxsize=16)
+def resolve_executable(executable: str) -> str:
+    """
+    Resolve an executable name to a full path via PATH.
+
+    Args:
+        executable: Executable name or path
+
+    Returns:
+        Resolved path, or the input unchanged if it cannot be found
+    """
+    return shutil.which(executable) or executable
+
+
+def build_tool_args(config: dict[str, Any], file_paths: List[str | None]) -> List[str]:
+    """
+    Build the argument list for an external tool from its configuration.
+
+    Each path is substituted into its own argument, so paths with spaces need no quoting.
+
+    Args:
+        config: External tool configuration (see Settings.get_external_tool_config)
+        file_paths: File path per location (None where the file does not exist)
+
+    Returns:
+        Command line arguments, excluding the executable
+    """
+    args = []
+
+    arg_before = config.get("arg_before", "").strip()
+    if arg_before:
+        args.append(arg_before)
+
+    arg_templates = [config.get("arg1", "%s"), config.get("arg2", "%s"), config.get("arg3", "%s")]
+
+    if config.get("pack_args", False):
+        # Pack arguments (remove gaps)
+        for path in file_paths:
+            if path and arg_templates:
+                template = arg_templates.pop(0)
+                args.append(template.replace("%s", path))
+    else:
+        # Use arguments as-is
+        for path, template in zip(file_paths, arg_templates):
+            if path:
+                args.append(template.replace("%s", path))
+
+    arg_after = config.get("arg_after", "").strip()
+    if arg_after:
+        args.append(arg_after)
+
+    return args
+
+
+def launch(executable: str, args: List[str]) -> None:
+    """
+    Start an external tool detached from this process.
+
+    Args:
+        executable: Executable name or path
+        args: Command line arguments
+    """
+    subprocess.Popen([resolve_executable(executable)] + args, start_new_session=(os.name != "nt"))
@@ -1,11 +1,49 @@
 """File type detection utilities."""
 
+import os
+import re
+import sys
 from enum import Enum
+from functools import lru_cache
 from pathlib import Path
 
+# Extensions (without dots) treated as text and image files by default
+DEFAULT_TEXT_EXTENSIONS = (
+    "txt",
+    "py",
+    "java",
+    "c",
+    "cpp",
+    "h",
+    "hpp",
+    "cs",
+    "js",
+    "ts",
+    "html",
+    "css",
+    "xml",
+    "json",
+    "yaml",
+    "yml",
+    "md",
+    "rst",
+    "ini",
+    "cfg",
+    "conf",
+    "log",
+    "sh",
+    "bash",
+    "zsh",
+    "ps1",
+    "bat",
+    "cmd",
+)
+DEFAULT_IMAGE_EXTENSIONS = ("jpg", "jpeg", "png", "gif", "bmp", "tiff", "tif", "webp", "ico", "svg")
+
 
 class FileType(Enum):
     """File type enumeration."""
+
     TEXT = "text"
     IMAGE = "image"
     BINARY = "binary"
@@ -22,14 +60,9 @@ class FileTypeDetector:
             text_extensions: Set of text file extensions (without dots)
             image_extensions: Set of image file extensions (without dots)
         """
-        self.text_extensions = text_extensions or {
-            'txt', 'py', 'java', 'c', 'cpp', 'h', 'hpp', 'cs', 'js', 'ts',
-            'html', 'css', 'xml', 'json', 'yaml', 'yml', 'md', 'rst', 'ini',
-            'cfg', 'conf', 'log', 'sh', 'bash', 'zsh', 'ps1', 'bat', 'cmd'
-        }
-        self.image_extensions = image_extensions or {
-            'jpg', 'jpeg', 'png', 'gif', 'bmp', 'tiff', 'tif', 'webp', 'ico', 'svg'
-        }
+        self.text_extensions = text_extensions or set(DEFAULT_TEXT_EXTENSIONS)
+        self.image_extensions = image_extensions or set(DEFAULT_IMAGE_EXTENSIONS)
+        self._build_index()
 
     def detect(self, file_path: Path | str) -> FileType:
         """
@@ -41,20 +74,67 @@ class FileTypeDetector:
         Returns:
             FileType enum value
         """
-        path = Path(file_path)
-        ext = path.suffix.lower().lstrip('.')
-
-        if ext in self.text_extensions:
-            return FileType.TEXT
-        elif ext in self.image_extensions:
-            return FileType.IMAGE
-        else:
-            return FileType.BINARY
+        ext = os.path.splitext(file_path)[1][1:].lower()
+        return self._index.get(ext, FileType.BINARY)
 
     def update_text_extensions(self, extensions: set[str]) -> None:
         """Update text file extensions."""
         self.text_extensions = extensions
+        self._build_index()
 
     def update_image_extensions(self, extensions: set[str]) -> None:
         """Update image file extensions."""
         self.image_extensions = extensions
+        self._build_index()
+
+    def _build_index(self) -> None:
+        """Merge both extension sets into one lookup; text wins if an extension is in both."""
+        self._index = {ext: FileType.IMAGE for ext in self.image_extensions}
+        self._index.update((ext, FileType.TEXT) for ext in self.text_extensions)
+
+
+# Separators accepted between extensions in the settings text
+EXTENSION_SEPARATOR = re.compile(r"[\s,;]+")
+
+
+def _split_extensions(extensions: str) -> list[str]:
+    """Split an extension list into lowercase extensions without dots, first occurrence kept."""
+    names = (ext.lstrip(".").lower() for ext in EXTENSION_SEPARATOR.split(extensions))
+    # Interned, so every detector built from a settings string shares one copy of each extension
+    return list(dict.fromkeys(sys.intern(name) for name in names if name))
+
+
+def normalize_extensions(extensions: str) -> str:
+    """
+    Normalize an extension list as entered by the user.
+
+    Args:
+        extensions: Extensions separated by newlines, spaces, commas or semicolons, with or without dots
+
+    Returns:
+        Newline-separated lowercase extensions without dots or duplicates, in their original order
+    """
+    return "\n".join(_split_extensions(extensions))
+
+
+def _parse_extensions(extensions: str) -> set[str]:
+    """Parse an extension list into a set."""
+    return set(_split_extensions(extensions))
+
+
+@lru_cache(maxsize=8)
+def create_detector(text_extensions: str, image_extensions: str) -> FileTypeDetector:
+    """
+    Get a file type detector for newline-separated extension settings.
+
+    Detectors are cached per settings string, so repeated tabs with unchanged
+    settings share one instance instead of re-parsing the lists.
+
+    Args:
+        text_extensions: Text file extensions as newline-separated string
+        image_extensions: Image file extensions as newline-separated string
+
+    Returns:
+        FileTypeDetector instance
+    """
+    return FileTypeDetector(_parse_extensions(text_extensions), _parse_extensions(image_extensions))
@@ -2,11 +2,12 @@
 
 import json
 import locale
+from functools import lru_cache
 from pathlib import Path
 from typing import Dict, Optional
 
 # Singleton translator instance
-_translator: Optional['Translator'] = None
+_translator: Optional["Translator"] = None
 
 
 class Translator:
@@ -37,30 +38,29 @@ class Translator:
             sys_locale = locale.getlocale()[0]
             if sys_locale:
                 # Convert Python locale to our format
-                if sys_locale.startswith('ja') or 'Japanese' in sys_locale:
-                    return 'ja-JP'
-                elif sys_locale.startswith('en') or 'English' in sys_locale:
-                    return 'en-US'
+                if sys_locale.startswith("ja") or "Japanese" in sys_locale:
+                    return "ja-JP"
+                elif sys_locale.startswith("en") or "English" in sys_locale:
+                    return "en-US"
         except Exception:
             pass
-        
+
         # Default to English
-        return 'en-US'
+        return "en-US"
 
     def _load_translations(self):
         """Load translations from JSON file."""
         # Try to load the specified language
         lang_file = self.locales_dir / f"{self.current_language}.json"
-        
+
         if not lang_file.exists():
             # Fallback to English
-            self.current_language = 'en-US'
+            self.current_language = "en-US"
             lang_file = self.locales_dir / "en-US.json"
-        
+
         if lang_file.exists():
             try:
-                with open(lang_file, 'r', encoding='utf-8') as f:
-                    self.translations = json.load(f)
+                self.translations = _read_translations(str(lang_file), lang_file.stat().st_mtime_ns)
             except Exception as e:
                 print(f"Failed to load translations: {e}")
                 self.translations = {}
@@ -91,14 +91,15 @@ class Translator:
             Translated string
         """
         text = self.translations.get(key, key)
-        
+
         # Apply formatting if arguments provided
         if args or kwargs:
             try:
-                return text.format(*args, **kwargs)
-            except (KeyError, IndexError, ValueError):
-                return text
-        
+                return _format_text(text, *args, **kwargs)
+            except TypeError:
+                # Unhashable arguments cannot go through the cache
+                return _format_text.__wrapped__(text, *args, **kwargs)
+
         return text
 
     def get_available_languages(self) -> Dict[str, str]:
@@ -108,29 +109,91 @@ class Translator:
         Returns:
             Dictionary of language code to display name
         """
-        languages = {}
-        
-        if self.locales_dir.exists():
-            for lang_file in self.locales_dir.glob("*.json"):
-                lang_code = lang_file.stem
-                
-                # Load language name from the file
-                try:
-                    with open(lang_file, 'r', encoding='utf-8') as f:
-                        data = json.load(f)
-                        # Use the language's own name if available
-                        if lang_code == 'ja-JP':
-                            lang_name = data.get('language_ja', '日本語')
-                        elif lang_code == 'en-US':
-                            lang_name = data.get('language_en', 'English')
-                        else:
-                            lang_name = lang_code
-                        
-                        languages[lang_code] = lang_name
-                except Exception:
-                    languages[lang_code] = lang_code
-        
-        return languages
+        if not self.locales_dir.exists():
+            return {}
+        # The directory mtime changes when a locale file is added or removed
+        return dict(_discover_languages(str(self.locales_dir), self.locales_dir.stat().st_mtime_ns))
+
+
+@lru_cache(maxsize=1024, typed=True)
+def _format_text(text: str, /, *args, **kwargs) -> str:
+    """
+    Format a translated text.
+
+    Cached because the same status texts are formatted with the same values for many rows.
+    The text rather than the key is part of the cache key, so changing the language needs no invalidation.
+    Arguments are passed individually and typed, so equal values of different types (100, 100.0, True) are
+    cached apart instead of sharing one formatted text.
+
+    Args:
+        text: Translated text containing format placeholders
+        *args: Positional arguments for string formatting
+        **kwargs: Keyword arguments for string formatting
+
+    Returns:
+        Formatted text, or the text unchanged if it does not match the arguments
+    """
+    if "{" not in text:
+        return text
+    try:
+        return text.format(*args, **kwargs)
+    except (KeyError, IndexError, ValueError):
+        return text
+
+
+@lru_cache(maxsize=8)
+def _read_translations(path: str, mtime_ns: int) -> Dict[str, str]:
+    """
+    Read a translation file.
+
+    Cached per modification time, so switching back to a language does not parse its file again.
+    The returned dictionary is shared and must not be modified.
+
+    Args:
+        path: Translation file path
+        mtime_ns: Modification time of the file (cache key only)
+
+    Returns:
+        Dictionary of translation key to text
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+@lru_cache(maxsize=4)
+def _discover_languages(locales_dir: str, dir_mtime_ns: int) -> Dict[str, str]:
+    """
+    List the languages in a locales directory.
+
+    Args:
+        locales_dir: Directory containing the translation files
+        dir_mtime_ns: Modification time of the directory (cache key only)
+
+    Returns:
+        Dictionary of language code to display name
+    """
+    languages = {}
+
+    for lang_file in Path(locales_dir).glob("*.json"):
+        lang_code = lang_file.stem
+
+        # Load language name from the file
+        try:
+            with open(lang_file, "r", encoding="utf-8") as f:
+                data = json.load(f)
+                # Use the language's own name if available
+                if lang_code == "ja-JP":
+                    lang_name = data.get("language_ja", "日本語")
+                elif lang_code == "en-US":
+                    lang_name = data.get("language_en", "English")
+                else:
+                    lang_name = lang_code
+
+                languages[lang_code] = lang_name
+        except Exception:
+            languages[lang_code] = lang_code
+
+    return languages
 
 
 def init_translator(language: Optional[str] = None) -> Translator:
@@ -173,7 +236,11 @@ def tr(key: str, *args, **kwargs) -> str:
     Returns:
         Translated string
     """
-    return get_translator().translate(key, *args, **kwargs)
+    translator = _translator if _translator is not None else get_translator()
+    if args or kwargs:
+        return translator.translate(key, *args, **kwargs)
+    # Plain lookups (the vast majority) go straight to the loaded table
+    return translator.translations.get(key, key)
 
 
 def set_language(language: str):
@@ -2,112 +2,250 @@
 
 import json
 from pathlib import Path
+from types import MappingProxyType
 from typing import Any
-from PySide6.QtCore import QSettings
+from PySide6.QtCore import QCoreApplication, QSettings, QTimer
+
+from .file_types import DEFAULT_IMAGE_EXTENSIONS, DEFAULT_TEXT_EXTENSIONS, FileTypeDetector, create_detector
+
+# File types that have an external tool configuration
+EXTERNAL_TOOL_TYPES = ("text", "image", "binary")
+
+# External tool configuration used until one is saved; read-only, as it is shared by every merged configuration
+DEFAULT_EXTERNAL_TOOL_CONFIG = MappingProxyType(
+    {"executable": "", "arg_before": "", "arg1": "%s", "arg2": "%s", "arg3": "%s", "arg_after": "", "pack_args": False}
+)
+
+# Similarity threshold (0-100) of each file type until one is saved
+DEFAULT_SIMILARITY_THRESHOLDS = {"text": 95.0, "image": 99.0, "binary": 100.0}
+
+# Number of comparisons kept in the history
+HISTORY_SIZE = 50
+
+# Milliseconds after the last change before changed settings are written to storage
+FLUSH_DELAY_MS = 2000
+
+
+def _dump_json(value: Any) -> str:
+    """
+    Serialize a value stored as a JSON string inside QSettings.
+
+    Non-ASCII paths are kept as-is instead of \\u escapes, and no padding is written.
+
+    Args:
+        value: JSON-serializable value
+
+    Returns:
+        JSON text
+    """
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+
+
+def _history_key(item: dict[str, Any]) -> str:
+    """Get the canonical JSON of a history entry; equal entries have equal keys."""
+    return json.dumps(item, sort_keys=True, separators=(",", ":"))
+
+
+def _index_history(history: list[dict[str, Any]]) -> dict[str, dict[str, Any]]:
+    """
+    Index a history list, newest first as stored, into entries keyed by canonical JSON.
+
+    Args:
+        history: History entries, newest first
+
+    Returns:
+        Dictionary of entries oldest first; of duplicate entries only the newest is kept
+    """
+    entries = {}
+    for item in reversed(history):
+        key = _history_key(item)
+        entries.pop(key, None)
+        entries[key] = item
+    return entries
 
 
 class Settings:
     """Application settings manager."""
 
-    DEFAULT_TEXT_EXTENSIONS = """txt
-py
-java
-c
-cpp
-h
-hpp
-cs
-js
-ts
-html
-css
-xml
-json
-yaml
-yml
-md
-rst
-ini
-cfg
-conf
-log
-sh
-bash
-zsh
-ps1
-bat
-cmd"""
-
-    DEFAULT_IMAGE_EXTENSIONS = """jpg
-jpeg
-png
-gif
-bmp
-tiff
-tif
-webp
-ico
-svg"""
+    # Default extension settings, joined once from the detector defaults
+    DEFAULT_TEXT_EXTENSIONS = "\n".join(DEFAULT_TEXT_EXTENSIONS)
+    DEFAULT_IMAGE_EXTENSIONS = "\n".join(DEFAULT_IMAGE_EXTENSIONS)
 
     def __init__(self):
         """Initialize settings manager."""
-        self._settings = QSettings("difflex", "difflex")
+        # Opened on first access, so a Settings object that is never read or written touches no storage
+        self._qsettings: QSettings | None = None
+        # Values read from or written to QSettings by key, so each key hits the backend (registry, plist or INI) once
+        self._cache: dict[str, Any] = {}
+        # Decoded forms of the JSON-encoded settings, so each is parsed once
+        self._tool_configs: dict[str, dict[str, Any]] = {}
+        # History entries oldest first, keyed by their canonical JSON so duplicates are found by hash
+        self._history: dict[str, dict[str, Any]] | None = None
+        # Changed values not yet written to QSettings
+        self._pending: dict[str, Any] = {}
+
+        # Writes are collected and flushed together shortly after the last change and when the application quits.
+        # Without a running application nothing would flush them later, so they are written immediately.
+        self._flush_timer: QTimer | None = None
+        app = QCoreApplication.instance()
+        if app is not None:
+            self._flush_timer = QTimer()
+            self._flush_timer.setSingleShot(True)
+            self._flush_timer.setInterval(FLUSH_DELAY_MS)
+            self._flush_timer.timeout.connect(self.flush)
+            app.aboutToQuit.connect(self.flush)
+
+    @property
+    def _settings(self) -> QSettings:
+        """Get the QSettings backend, opening it on first use."""
+        if self._qsettings is None:
+            self._qsettings = QSettings("difflex", "difflex")
+        return self._qsettings
+
+    def _get(self, key: str, default: Any, value_type: type | None = None) -> Any:
+        """
+        Read a setting, from QSettings on first use and from the cache afterwards.
+
+        Args:
+            key: Storage key
+            default: Value returned when the key is not stored
+            value_type: Type the stored value is converted to, if any
+
+        Returns:
+            Setting value
+        """
+        try:
+            return self._cache[key]
+        except KeyError:
+            pass
+        if value_type is None:
+            value = self._settings.value(key, default)
+        else:
+            value = self._settings.value(key, default, type=value_type)
+        self._cache[key] = value
+        return value
+
+    def _set(self, key: str, value: Any) -> None:
+        """Write a setting to the cache; it is stored with the next flush. Unchanged values are not written again."""
+        if key in self._cache and self._cache[key] == value:
+            return
+        self._cache[key] = value
+        self._pending[key] = value
+        if self._flush_timer is None:
+            self.flush()
+        else:
+            self._flush_timer.start()
+
+    def flush(self) -> None:
+        """Write all changed settings to QSettings and storage at once."""
+        if self._flush_timer is not None:
+            self._flush_timer.stop()
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, {}
+        for key, value in pending.items():
+            self._settings.setValue(key, value)
+        self._settings.sync()
 
     def get_text_extensions(self) -> str:
         """Get text file extensions as newline-separated string."""
-        return self._settings.value("text_extensions", self.DEFAULT_TEXT_EXTENSIONS)
+        return self._get("text_extensions", self.DEFAULT_TEXT_EXTENSIONS)
 
     def set_text_extensions(self, extensions: str) -> None:
         """Set text file extensions."""
-        self._settings.setValue("text_extensions", extensions)
+        self._set("text_extensions", extensions)
 
     def get_image_extensions(self) -> str:
         """Get image file extensions as newline-separated string."""
-        return self._settings.value("image_extensions", self.DEFAULT_IMAGE_EXTENSIONS)
+        return self._get("image_extensions", self.DEFAULT_IMAGE_EXTENSIONS)
 
     def set_image_extensions(self, extensions: str) -> None:
         """Set image file extensions."""
-        self._settings.setValue("image_extensions", extensions)
+        self._set("image_extensions", extensions)
+
+    def get_file_type_detector(self) -> FileTypeDetector:
+        """
+        Get a file type detector for the current extension settings.
+
+        Detectors are shared per extension settings, so the lists are parsed once rather than per comparison view,
+        and an edited list yields a new detector.
+
+        Returns:
+            FileTypeDetector instance
+        """
+        return create_detector(self.get_text_extensions(), self.get_image_extensions())
 
     def get_dark_mode(self) -> bool:
         """Get dark mode setting."""
-        return self._settings.value("dark_mode", True, type=bool)
+        return self._get("dark_mode", True, bool)
 
     def set_dark_mode(self, enabled: bool) -> None:
         """Set dark mode."""
-        self._settings.setValue("dark_mode", enabled)
+        self._set("dark_mode", enabled)
 
     def get_language(self) -> str:
         """Get language setting."""
-        return self._settings.value("language", "", type=str)
+        return self._get("language", "", str)
 
     def set_language(self, language: str) -> None:
         """Set language."""
-        self._settings.setValue("language", language)
+        self._set("language", language)
+
+    def get_similarity_threshold(self, file_type: str) -> float:
+        """
+        Get the similarity threshold for a file type.
+
+        Args:
+            file_type: 'text', 'image', or 'binary'
+
+        Returns:
+            Threshold percentage (0-100)
+        """
+        return self._get(f"{file_type}_similarity_threshold", DEFAULT_SIMILARITY_THRESHOLDS[file_type], float)
+
+    def set_similarity_threshold(self, file_type: str, threshold: float) -> None:
+        """Set the similarity threshold for a file type."""
+        self._set(f"{file_type}_similarity_threshold", threshold)
 
     def get_text_similarity_threshold(self) -> float:
         """Get text similarity threshold (0-100)."""
-        return self._settings.value("text_similarity_threshold", 95.0, type=float)
+        return self.get_similarity_threshold("text")
 
     def set_text_similarity_threshold(self, threshold: float) -> None:
         """Set text similarity threshold."""
-        self._settings.setValue("text_similarity_threshold", threshold)
+        self.set_similarity_threshold("text", threshold)
 
     def get_image_similarity_threshold(self) -> float:
         """Get image similarity threshold (0-100)."""
-        return self._settings.value("image_similarity_threshold", 99.0, type=float)
+        return self.get_similarity_threshold("image")
 
     def set_image_similarity_threshold(self, threshold: float) -> None:
         """Set image similarity threshold."""
-        self._settings.setValue("image_similarity_threshold", threshold)
+        self.set_similarity_threshold("image", threshold)
 
     def get_binary_similarity_threshold(self) -> float:
         """Get binary similarity threshold (0-100)."""
-        return self._settings.value("binary_similarity_threshold", 100.0, type=float)
+        return self.get_similarity_threshold("binary")
 
     def set_binary_similarity_threshold(self, threshold: float) -> None:
         """Set binary similarity threshold."""
-        self._settings.setValue("binary_similarity_threshold", threshold)
+        self.set_similarity_threshold("binary", threshold)
+
+    def get_strict_comparison(self) -> bool:
+        """Get whether files with equal size and modification time are still compared by content."""
+        return self._get("strict_comparison", False, bool)
+
+    def set_strict_comparison(self, enabled: bool) -> None:
+        """Set strict comparison."""
+        self._set("strict_comparison", enabled)
+
+    def get_comparison_workers(self) -> int:
+        """Get the number of comparison threads (0 for one per CPU)."""
+        return self._get("comparison_workers", 0, int)
+
+    def set_comparison_workers(self, workers: int) -> None:
+        """Set the number of comparison threads."""
+        self._set("comparison_workers", workers)
 
     def get_external_tool_config(self, file_type: str) -> dict[str, Any]:
         """
@@ -119,28 +257,60 @@ svg"""
         Returns:
             Dictionary with 'executable', 'arg_before', 'arg1', 'arg2', 'arg3', 'arg_after', 'pack_args'
         """
-        key = f"external_tool_{file_type}"
-        default = {
-            "executable": "",
-            "arg_before": "",
-            "arg1": "%s",
-            "arg2": "%s",
-            "arg3": "%s",
-            "arg_after": "",
-            "pack_args": False
-        }
-        value = self._settings.value(key, "")
-        if value:
+        config = self._tool_configs.get(file_type)
+        if config is None:
+            config = dict(DEFAULT_EXTERNAL_TOOL_CONFIG)
             try:
-                return json.loads(value)
+                # Keys missing from older saved configurations, or all of them when none is saved, keep their defaults
+                config.update(json.loads(self._get(f"external_tool_{file_type}", "") or "{}"))
             except json.JSONDecodeError:
-                return default
-        return default
+                pass
+            self._tool_configs[file_type] = config
+        # Callers get their own copy, so the cached configuration cannot be changed behind its JSON
+        return dict(config)
 
     def set_external_tool_config(self, file_type: str, config: dict[str, Any]) -> None:
         """Set external tool configuration for a file type."""
-        key = f"external_tool_{file_type}"
-        self._settings.setValue(key, json.dumps(config))
+        merged = {**DEFAULT_EXTERNAL_TOOL_CONFIG, **config}
+        if merged == self._tool_configs.get(file_type):
+            return
+        self._tool_configs[file_type] = merged
+        self._set(f"external_tool_{file_type}", _dump_json(config))
+
+    def load_all(self) -> dict[str, Any]:
+        """
+        Read every user-editable setting in one pass.
+
+        Returns:
+            Dictionary keyed by storage key; external tool configurations are decoded dicts
+        """
+        values = {
+            "language": self.get_language(),
+            "dark_mode": self.get_dark_mode(),
+            "text_extensions": self.get_text_extensions(),
+            "image_extensions": self.get_image_extensions(),
+            "strict_comparison": self.get_strict_comparison(),
+            "comparison_workers": self.get_comparison_workers(),
+        }
+        for file_type in DEFAULT_SIMILARITY_THRESHOLDS:
+            values[f"{file_type}_similarity_threshold"] = self.get_similarity_threshold(file_type)
+        for file_type in EXTERNAL_TOOL_TYPES:
+            values[f"external_tool_{file_type}"] = self.get_external_tool_config(file_type)
+        return values
+
+    def save_all(self, values: dict[str, Any]) -> None:
+        """
+        Write several settings and flush them to storage immediately.
+
+        Args:
+            values: Dictionary keyed by storage key, as returned by load_all (may be partial)
+        """
+        for key, value in values.items():
+            if key.startswith("external_tool_"):
+                self.set_external_tool_config(key.removeprefix("external_tool_"), value)
+            else:
+                self._set(key, value)
+        self.flush()
 
     def get_external_text_tool(self) -> str:
         """Get external text tool command line."""
@@ -181,25 +351,36 @@ svg"""
 
         return " ".join(parts)
 
+    def _history_entries(self) -> dict[str, dict[str, Any]]:
+        """Get the decoded comparison history, oldest first, parsing the stored JSON on first use."""
+        if self._history is None:
+            try:
+                history = json.loads(self._get("comparison_history", "[]"))
+            except json.JSONDecodeError:
+                history = []
+            self._history = _index_history(history)
+        return self._history
+
     def get_comparison_history(self) -> list[dict[str, Any]]:
         """Get comparison history."""
-        value = self._settings.value("comparison_history", "[]")
-        try:
-            return json.loads(value)
-        except json.JSONDecodeError:
-            return []
+        return list(reversed(self._history_entries().values()))
 
     def set_comparison_history(self, history: list[dict[str, Any]]) -> None:
         """Set comparison history."""
-        self._settings.setValue("comparison_history", json.dumps(history))
+        self._history = _index_history(history)
+        self._set("comparison_history", _dump_json(history))
 
     def add_to_history(self, item: dict[str, Any]) -> None:
         """Add item to comparison history."""
-        history = self.get_comparison_history()
-        # Remove duplicates
-        history = [h for h in history if h != item]
-        # Add to beginning
-        history.insert(0, item)
-        # Keep only last 50 items
-        history = history[:50]
-        self.set_comparison_history(history)
+        history = self._history_entries()
+        key = _history_key(item)
+        if next(reversed(history), None) == key:
+            # Already the newest entry; the stored history would not change
+            return
+        # Move a duplicate to the newest position instead of adding it twice
+        history.pop(key, None)
+        history[key] = item
+        # Keep only the latest items
+        while len(history) > HISTORY_SIZE:
+            del history[next(iter(history))]
+        self._set("comparison_history", _dump_json(list(reversed(history.values()))))